@@ -21,15 +21,12 @@ async def get_performance_metrics():
         - Max drawdown
         - Beta
     """
-    try:
-        # TODO: Get real portfolio data from Schwab API
-        # For now, return placeholder
-        raise HTTPException(
-            status_code=501,
-            detail="Performance metrics - awaiting Schwab API integration"
-        )
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    # TODO: Get real portfolio data from Schwab API
+    # For now, return placeholder
+    raise HTTPException(
+        status_code=501,
+        detail="Performance metrics - awaiting Schwab API integration"
+    )
 
 @router.get("/risk", response_model=RiskAnalysis)
 async def get_risk_analysis():
@@ -43,14 +40,11 @@ async def get_risk_analysis():
         - Maximum drawdown
         - Correlation matrix (optional)
     """
-    try:
-        # TODO: Calculate from real portfolio data
-        raise HTTPException(
-            status_code=501,
-            detail="Risk analysis - awaiting portfolio data"
-        )
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    # TODO: Calculate from real portfolio data
+    raise HTTPException(
+        status_code=501,
+        detail="Risk analysis - awaiting portfolio data"
+    )
 
 @router.post("/optimize", response_model=OptimizationResponse)
 async def optimize_portfolio(request: OptimizationRequest):
@@ -62,27 +56,29 @@ async def optimize_portfolio(request: OptimizationRequest):
             - risk_tolerance: 0 (conservative) to 1 (aggressive)
             - target_return: Optional target return
             - constraints: Optional constraints dict
+            - objective: "mvp", "sharpe", "risk_parity" or "tracking_error"
     
     Returns:
         Recommended portfolio weights and expected metrics
     """
-    try:
-        # TODO: Get current positions from Schwab API
-        # positions = await get_current_positions()
-        
-        # Perform optimization
-        # result = analytics_service.optimize_portfolio(
-        #     positions=positions,
-        #     risk_tolerance=request.risk_tolerance,
-        #     target_return=request.target_return
-        # )
-        
-        raise HTTPException(
-            status_code=501,
-            detail="Portfolio optimization - awaiting position data"
-        )
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    # TODO: Get current positions from Schwab API
+    # positions = await get_current_positions()
+    
+    # Perform optimization
+    # historical_prices = await get_price_histories(positions)
+    # result = analytics_service.optimize_portfolio(
+    #     positions=positions,
+    #     risk_tolerance=request.risk_tolerance,
+    #     target_return=request.target_return,
+    #     historical_prices=historical_prices,
+    #     constraints=request.constraints,
+    #     objective=request.objective
+    # )
+    
+    raise HTTPException(
+        status_code=501,
+        detail="Portfolio optimization - awaiting position data"
+    )
 
 @router.get("/correlation")
 async def get_correlation_matrix():
@@ -91,13 +87,14 @@ async def get_correlation_matrix():
     
     Shows how different holdings move relative to each other
     """
-    try:
-        raise HTTPException(
-            status_code=501,
-            detail="Correlation matrix - awaiting historical data"
-        )
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    # TODO: Get aligned returns for current positions
+    # returns, symbols = await get_position_returns()
+    # return analytics_service.correlation_matrix(returns, symbols)
+    
+    raise HTTPException(
+        status_code=501,
+        detail="Correlation matrix - awaiting historical data"
+    )
 
 @router.get("/efficient-frontier")
 async def get_efficient_frontier():
@@ -107,13 +104,14 @@ async def get_efficient_frontier():
     Returns points on the efficient frontier showing optimal
     risk/return tradeoffs
     """
-    try:
-        raise HTTPException(
-            status_code=501,
-            detail="Efficient frontier - awaiting implementation"
-        )
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    # TODO: Get price history for current positions
+    # historical_prices = await get_price_histories(positions)
+    # return analytics_service.efficient_frontier(historical_prices)
+    
+    raise HTTPException(
+        status_code=501,
+        detail="Efficient frontier - awaiting implementation"
+    )
 
 @router.get("/factor-analysis")
 async def get_factor_analysis():
@@ -126,13 +124,10 @@ async def get_factor_analysis():
     - Value factor (value vs growth)
     - Momentum factor
     """
-    try:
-        raise HTTPException(
-            status_code=501,
-            detail="Factor analysis - awaiting implementation"
-        )
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    raise HTTPException(
+        status_code=501,
+        detail="Factor analysis - awaiting implementation"
+    )
 
 @router.get("/performance-attribution")
 async def get_performance_attribution():
@@ -144,13 +139,10 @@ async def get_performance_attribution():
     - Security selection
     - Market timing
     """
-    try:
-        raise HTTPException(
-            status_code=501,
-            detail="Performance attribution - awaiting implementation"
-        )
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    raise HTTPException(
+        status_code=501,
+        detail="Performance attribution - awaiting implementation"
+    )
 
 @router.get("/drawdown-analysis")
 async def get_drawdown_analysis():
@@ -163,10 +155,11 @@ async def get_drawdown_analysis():
         - Recovery time
         - Current drawdown status
     """
-    try:
-        raise HTTPException(
-            status_code=501,
-            detail="Drawdown analysis - awaiting historical data"
-        )
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+    # TODO: Get portfolio value history
+    # historical_values = await get_portfolio_history()
+    # return analytics_service.calculate_drawdown_periods(historical_values)
+    
+    raise HTTPException(
+        status_code=501,
+        detail="Drawdown analysis - awaiting historical data"
+    )
\ No newline at end of file
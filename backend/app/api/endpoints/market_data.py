@@ -1,8 +1,16 @@
 from fastapi import APIRouter, HTTPException
-from typing import List
+from fastapi.responses import StreamingResponse
+from typing import List, Literal
 from app.schemas.portfolio import StockQuote, MarketIndex
+from app.services.market_data import (
+    MarketDataService,
+    HISTORY_COLUMNS,
+    ARROW_STREAM_MEDIA_TYPE,
+    history_to_arrow_stream,
+)
 
 router = APIRouter()
+market_data_service = MarketDataService()
 
 @router.get("/quote/{symbol}", response_model=StockQuote)
 async def get_stock_quote(symbol: str):
@@ -15,14 +23,11 @@ async def get_stock_quote(symbol: str):
     Returns:
         Current price, change, volume, and fundamentals
     """
-    try:
-        # TODO: Implement with Schwab Market Data API or yfinance
-        raise HTTPException(
-            status_code=501,
-            detail=f"Quote for {symbol} - awaiting market data integration"
-        )
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    # TODO: Implement with Schwab Market Data API or yfinance
+    raise HTTPException(
+        status_code=501,
+        detail=f"Quote for {symbol} - awaiting market data integration"
+    )
 
 @router.get("/quotes", response_model=List[StockQuote])
 async def get_multiple_quotes(symbols: str):
@@ -32,16 +37,11 @@ async def get_multiple_quotes(symbols: str):
     Args:
         symbols: Comma-separated list of symbols (e.g., "AAPL,MSFT,GOOGL")
     """
-    try:
-        symbol_list = [s.strip().upper() for s in symbols.split(",")]
-        
-        # TODO: Implement batch quote fetching
-        raise HTTPException(
-            status_code=501,
-            detail="Batch quotes - awaiting market data integration"
-        )
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    # Upper-case and strip spaces in one pass over the whole string
+    symbol_list = [s for s in symbols.upper().replace(" ", "").split(",") if s]
+    
+    # Single batched provider request per chunk, never one per symbol
+    return await market_data_service.batch_quotes(symbol_list)
 
 @router.get("/indices", response_model=List[MarketIndex])
 async def get_market_indices():
@@ -54,20 +54,18 @@ async def get_market_indices():
         - Nasdaq
         - Russell 2000
     """
-    try:
-        # TODO: Implement with market data source
-        raise HTTPException(
-            status_code=501,
-            detail="Market indices - awaiting market data integration"
-        )
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    # TODO: Implement with market data source
+    raise HTTPException(
+        status_code=501,
+        detail="Market indices - awaiting market data integration"
+    )
 
 @router.get("/history/{symbol}")
 async def get_price_history(
     symbol: str,
     period: str = "1y",
-    interval: str = "1d"
+    interval: str = "1d",
+    format: Literal["json", "arrow"] = "json"
 ):
     """
     Get historical price data
@@ -76,18 +74,21 @@ async def get_price_history(
         symbol: Stock ticker
         period: Time period (1d, 5d, 1mo, 3mo, 6mo, 1y, 2y, 5y, max)
         interval: Data interval (1m, 5m, 15m, 1h, 1d, 1wk, 1mo)
+        format: "json" for a list of rows, "arrow" for an Arrow IPC stream
     
     Returns:
         Historical OHLCV data
     """
-    try:
-        # TODO: Implement with Schwab API or yfinance
-        raise HTTPException(
-            status_code=501,
-            detail=f"Price history for {symbol} - awaiting implementation"
+    history = await market_data_service.get_price_history(symbol, period, interval)
+
+    if format == "arrow":
+        return StreamingResponse(
+            history_to_arrow_stream(history),
+            media_type=ARROW_STREAM_MEDIA_TYPE
         )
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+
+    columns = [history[column] for column in HISTORY_COLUMNS]
+    return [dict(zip(HISTORY_COLUMNS, row)) for row in zip(*columns)]
 
 @router.get("/search")
 async def search_stocks(query: str, limit: int = 10):
@@ -98,14 +99,7 @@ async def search_stocks(query: str, limit: int = 10):
         query: Search term
         limit: Maximum number of results
     """
-    try:
-        # TODO: Implement stock search
-        raise HTTPException(
-            status_code=501,
-            detail="Stock search - awaiting implementation"
-        )
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    return await market_data_service.search_symbols(query, limit)
 
 @router.get("/fundamentals/{symbol}")
 async def get_fundamentals(symbol: str):
@@ -118,18 +112,10 @@ async def get_fundamentals(symbol: str):
         - Dividend yield
         - EPS
         - Book value
-        - Debt/Equity
         - ROE, ROA
         - Profit margins
     """
-    try:
-        # TODO: Implement with financial data API
-        raise HTTPException(
-            status_code=501,
-            detail=f"Fundamentals for {symbol} - awaiting implementation"
-        )
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    return await market_data_service.fetch_fundamentals(symbol)
 
 @router.get("/sector-performance")
 async def get_sector_performance():
@@ -138,17 +124,14 @@ async def get_sector_performance():
     
     Returns sector returns and relative performance
     """
-    try:
-        # TODO: Implement sector analysis
-        raise HTTPException(
-            status_code=501,
-            detail="Sector performance - awaiting implementation"
-        )
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    # TODO: Implement sector analysis
+    raise HTTPException(
+        status_code=501,
+        detail="Sector performance - awaiting implementation"
+    )
 
 @router.get("/movers")
-async def get_market_movers(category: str = "gainers"):
+async def get_market_movers(category: Literal["gainers", "losers", "active"] = "gainers"):
     """
     Get top market movers
     
@@ -158,20 +141,8 @@ async def get_market_movers(category: str = "gainers"):
     Returns:
         List of top stocks by category
     """
-    try:
-        valid_categories = ["gainers", "losers", "active"]
-        if category not in valid_categories:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Invalid category. Must be one of: {valid_categories}"
-            )
-        
-        # TODO: Implement market movers
-        raise HTTPException(
-            status_code=501,
-            detail=f"Market {category} - awaiting implementation"
-        )
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+    # TODO: Implement market movers
+    raise HTTPException(
+        status_code=501,
+        detail=f"Market {category} - awaiting implementation"
+    )
\ No newline at end of file
@@ -1,5 +1,5 @@
 from fastapi import APIRouter, HTTPException
-from typing import List
+from typing import List, Literal
 from app.schemas.portfolio import (
     PricePrediction, PortfolioRecommendation, AnomalyDetection
 )
@@ -8,6 +8,22 @@ from app.services.ml_service import MLService
 router = APIRouter()
 ml_service = MLService()
 
+# Longest forecast horizon accepted, in days
+MAX_HORIZON_DAYS = 3650
+
+def _parse_horizons(horizons: str) -> List[int]:
+    """
+    Parse comma-separated horizons (e.g. "1,7,30")
+    
+    Raises ValueError on empty parts, non-integers and horizons outside
+    1..MAX_HORIZON_DAYS.
+    """
+    parsed = [int(part) for part in horizons.split(",")]
+    for horizon in parsed:
+        if not 1 <= horizon <= MAX_HORIZON_DAYS:
+            raise ValueError(f"Horizon {horizon} is outside 1..{MAX_HORIZON_DAYS} days")
+    return parsed
+
 @router.get("/predict/{symbol}", response_model=PricePrediction)
 async def predict_stock_price(symbol: str, horizons: str = "1,7,30"):
     """
@@ -20,26 +36,26 @@ async def predict_stock_price(symbol: str, horizons: str = "1,7,30"):
     Returns:
         Price predictions with confidence scores
     """
+    # Parse horizons
     try:
-        # Parse horizons
-        horizon_list = [int(h.strip()) for h in horizons.split(",")]
-        
-        # TODO: Get historical prices from Schwab API or market data service
-        # For now, return placeholder
-        raise HTTPException(
-            status_code=501,
-            detail=f"Price prediction for {symbol} - awaiting historical data"
-        )
+        horizon_list = _parse_horizons(horizons)
     except ValueError:
         raise HTTPException(
             status_code=400,
             detail="Invalid horizons format. Use comma-separated integers (e.g., '1,7,30')"
         )
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    
+    # TODO: Get historical prices from Schwab API or market data service
+    # For now, return placeholder
+    raise HTTPException(
+        status_code=501,
+        detail=f"Price prediction for {symbol} - awaiting historical data"
+    )
 
 @router.get("/recommendations", response_model=List[PortfolioRecommendation])
-async def get_portfolio_recommendations(risk_profile: str = "moderate"):
+async def get_portfolio_recommendations(
+    risk_profile: Literal["conservative", "moderate", "aggressive"] = "moderate"
+):
     """
     Get ML-generated portfolio recommendations
     
@@ -49,30 +65,18 @@ async def get_portfolio_recommendations(risk_profile: str = "moderate"):
     Returns:
         List of actionable recommendations with reasoning
     """
-    try:
-        valid_profiles = ["conservative", "moderate", "aggressive"]
-        if risk_profile not in valid_profiles:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Invalid risk profile. Must be one of: {valid_profiles}"
-            )
-        
-        # TODO: Get current positions from portfolio service
-        # positions = await get_current_positions()
-        
-        # recommendations = ml_service.generate_portfolio_recommendation(
-        #     positions=positions,
-        #     risk_profile=risk_profile
-        # )
-        
-        raise HTTPException(
-            status_code=501,
-            detail="Portfolio recommendations - awaiting position data"
-        )
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    # TODO: Get current positions from portfolio service
+    # positions = await get_current_positions()
+    
+    # recommendations = ml_service.generate_portfolio_recommendation(
+    #     positions=positions,
+    #     risk_profile=risk_profile
+    # )
+    
+    raise HTTPException(
+        status_code=501,
+        detail="Portfolio recommendations - awaiting position data"
+    )
 
 @router.get("/anomaly/{symbol}", response_model=AnomalyDetection)
 async def detect_anomalies(symbol: str):
@@ -85,21 +89,18 @@ async def detect_anomalies(symbol: str):
     Returns:
         Anomaly detection results with reasoning
     """
-    try:
-        # TODO: Get historical prices
-        # historical_prices = await get_price_history(symbol)
-        
-        # result = ml_service.detect_anomalies(
-        #     symbol=symbol,
-        #     historical_prices=historical_prices
-        # )
-        
-        raise HTTPException(
-            status_code=501,
-            detail=f"Anomaly detection for {symbol} - awaiting historical data"
-        )
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    # TODO: Get historical prices
+    # historical_prices = await get_price_history(symbol)
+    
+    # result = ml_service.detect_anomalies(
+    #     symbol=symbol,
+    #     historical_prices=historical_prices
+    # )
+    
+    raise HTTPException(
+        status_code=501,
+        detail=f"Anomaly detection for {symbol} - awaiting historical data"
+    )
 
 @router.get("/volatility/{symbol}")
 async def predict_volatility(symbol: str, horizon: int = 30):
@@ -113,14 +114,11 @@ async def predict_volatility(symbol: str, horizon: int = 30):
     Returns:
         Predicted volatility percentage
     """
-    try:
-        # TODO: Get historical returns
-        raise HTTPException(
-            status_code=501,
-            detail=f"Volatility prediction for {symbol} - awaiting implementation"
-        )
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    # TODO: Get historical returns
+    raise HTTPException(
+        status_code=501,
+        detail=f"Volatility prediction for {symbol} - awaiting implementation"
+    )
 
 @router.get("/risk-score/{symbol}")
 async def get_risk_score(symbol: str):
@@ -133,14 +131,11 @@ async def get_risk_score(symbol: str):
     Returns:
         Risk score (0-100) and risk level (low/medium/high)
     """
-    try:
-        # TODO: Get position and historical data
-        raise HTTPException(
-            status_code=501,
-            detail=f"Risk score for {symbol} - awaiting data"
-        )
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    # TODO: Get position and historical data
+    raise HTTPException(
+        status_code=501,
+        detail=f"Risk score for {symbol} - awaiting data"
+    )
 
 @router.get("/patterns/{symbol}")
 async def identify_chart_patterns(symbol: str):
@@ -153,18 +148,15 @@ async def identify_chart_patterns(symbol: str):
     Returns:
         Detected patterns (uptrend, downtrend, oversold, overbought, etc.)
     """
-    try:
-        # TODO: Get historical prices
-        # historical_prices = await get_price_history(symbol)
-        
-        # patterns = ml_service.identify_patterns(historical_prices)
-        
-        raise HTTPException(
-            status_code=501,
-            detail=f"Pattern detection for {symbol} - awaiting historical data"
-        )
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    # TODO: Get historical prices
+    # historical_prices = await get_price_history(symbol)
+    
+    # patterns = ml_service.identify_patterns(historical_prices)
+    
+    raise HTTPException(
+        status_code=501,
+        detail=f"Pattern detection for {symbol} - awaiting historical data"
+    )
 
 @router.get("/rebalancing-suggestions")
 async def get_rebalancing_suggestions():
@@ -173,14 +165,11 @@ async def get_rebalancing_suggestions():
     
     Analyzes current portfolio and suggests optimal rebalancing trades
     """
-    try:
-        # TODO: Implement rebalancing algorithm
-        raise HTTPException(
-            status_code=501,
-            detail="Rebalancing suggestions - awaiting implementation"
-        )
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    # TODO: Implement rebalancing algorithm
+    raise HTTPException(
+        status_code=501,
+        detail="Rebalancing suggestions - awaiting implementation"
+    )
 
 @router.get("/tax-loss-harvesting")
 async def find_tax_loss_opportunities():
@@ -190,17 +179,14 @@ async def find_tax_loss_opportunities():
     Find positions with losses that could be sold for tax benefits,
     along with similar replacement securities
     """
-    try:
-        # TODO: Implement tax-loss harvesting logic
-        raise HTTPException(
-            status_code=501,
-            detail="Tax-loss harvesting - awaiting implementation"
-        )
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    # TODO: Implement tax-loss harvesting logic
+    raise HTTPException(
+        status_code=501,
+        detail="Tax-loss harvesting - awaiting implementation"
+    )
 
 @router.post("/train-model")
-async def train_custom_model(model_type: str):
+async def train_custom_model(model_type: Literal["price", "risk", "allocation"]):
     """
     Train a custom ML model on user's portfolio data
     
@@ -210,20 +196,8 @@ async def train_custom_model(model_type: str):
     Returns:
         Training results and model metrics
     """
-    try:
-        valid_types = ["price", "risk", "allocation"]
-        if model_type not in valid_types:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Invalid model type. Must be one of: {valid_types}"
-            )
-        
-        # TODO: Implement custom model training
-        raise HTTPException(
-            status_code=501,
-            detail=f"Custom {model_type} model training - awaiting implementation"
-        )
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+    # TODO: Implement custom model training
+    raise HTTPException(
+        status_code=501,
+        detail=f"Custom {model_type} model training - awaiting implementation"
+    )
\ No newline at end of file
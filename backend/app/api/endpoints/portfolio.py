@@ -1,12 +1,15 @@
 from fastapi import APIRouter, HTTPException, Depends
-from typing import List
+from typing import Dict, List
+from app.core.config import Settings, get_settings
 from app.schemas.portfolio import PortfolioSummary, Position, Transaction
 from app.services.schwab_api import SchwabAPIClient, MockDataService
+from app.services.portfolio_cache import portfolio_aggregate_cache
 
 router = APIRouter()
 
 # Mock data service for development
 mock_service = MockDataService()
+MOCK_ACCOUNT_ID = "mock"
 
 @router.get("/summary", response_model=PortfolioSummary)
 async def get_portfolio_summary():
@@ -16,19 +19,16 @@ async def get_portfolio_summary():
     This endpoint will eventually integrate with Schwab API.
     Currently returns mock data for development.
     """
-    try:
-        # TODO: Replace with real Schwab API call when available
-        # schwab_client = SchwabAPIClient(access_token=get_user_token())
-        # portfolio_data = await schwab_client.get_positions(account_id)
-        
-        # For now, return mock data
-        # This should match the structure from your frontend mock data
-        raise HTTPException(
-            status_code=501,
-            detail="Portfolio summary endpoint - awaiting Schwab API integration"
-        )
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    # TODO: Replace with real Schwab API call when available
+    # schwab_client = SchwabAPIClient(access_token=get_user_token())
+    # portfolio_data = await schwab_client.get_positions(account_id)
+    
+    # For now, return mock data
+    # This should match the structure from your frontend mock data
+    raise HTTPException(
+        status_code=501,
+        detail="Portfolio summary endpoint - awaiting Schwab API integration"
+    )
 
 @router.get("/positions", response_model=List[Position])
 async def get_positions():
@@ -37,14 +37,11 @@ async def get_positions():
     
     Returns list of holdings with current prices and gains/losses
     """
-    try:
-        # TODO: Implement with Schwab API
-        raise HTTPException(
-            status_code=501,
-            detail="Positions endpoint - awaiting Schwab API integration"
-        )
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    # TODO: Implement with Schwab API
+    raise HTTPException(
+        status_code=501,
+        detail="Positions endpoint - awaiting Schwab API integration"
+    )
 
 @router.get("/positions/{symbol}", response_model=Position)
 async def get_position_detail(symbol: str):
@@ -54,14 +51,11 @@ async def get_position_detail(symbol: str):
     Args:
         symbol: Stock symbol (e.g., AAPL)
     """
-    try:
-        # TODO: Implement with Schwab API
-        raise HTTPException(
-            status_code=501,
-            detail=f"Position detail for {symbol} - awaiting Schwab API integration"
-        )
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    # TODO: Implement with Schwab API
+    raise HTTPException(
+        status_code=501,
+        detail=f"Position detail for {symbol} - awaiting Schwab API integration"
+    )
 
 @router.get("/transactions", response_model=List[Transaction])
 async def get_transactions(
@@ -79,14 +73,11 @@ async def get_transactions(
         end_date: End date (YYYY-MM-DD)
         transaction_type: Filter by type (buy, sell, dividend)
     """
-    try:
-        # TODO: Implement with Schwab API
-        raise HTTPException(
-            status_code=501,
-            detail="Transactions endpoint - awaiting Schwab API integration"
-        )
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    # TODO: Implement with Schwab API
+    raise HTTPException(
+        status_code=501,
+        detail="Transactions endpoint - awaiting Schwab API integration"
+    )
 
 @router.get("/performance/history")
 async def get_performance_history(days: int = 365):
@@ -96,35 +87,35 @@ async def get_performance_history(days: int = 365):
     Args:
         days: Number of days of history to return (default 365)
     """
-    try:
-        # TODO: Implement with Schwab API
+    # TODO: Implement with Schwab API
+    raise HTTPException(
+        status_code=501,
+        detail="Performance history - awaiting Schwab API integration"
+    )
+
+async def _allocation_aggregates(settings: Settings, name: str) -> Dict[str, Dict]:
+    """
+    Cached portfolio aggregates, refreshed from the current positions
+    
+    Positions come from MockDataService until the Schwab integration lands,
+    so they are only served in DEBUG; otherwise the endpoint returns 501.
+    """
+    if not settings.DEBUG:
         raise HTTPException(
             status_code=501,
-            detail="Performance history - awaiting Schwab API integration"
+            detail=f"{name} - awaiting Schwab API integration"
         )
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    positions = await mock_service.get_mock_positions(MOCK_ACCOUNT_ID)
+    return await portfolio_aggregate_cache.refresh(MOCK_ACCOUNT_ID, positions)
 
 @router.get("/allocations/sector")
-async def get_sector_allocation():
-    """Get sector allocation breakdown"""
-    try:
-        # TODO: Implement with Schwab API
-        raise HTTPException(
-            status_code=501,
-            detail="Sector allocation - awaiting Schwab API integration"
-        )
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+async def get_sector_allocation(settings: Settings = Depends(get_settings)):
+    """Get sector allocation breakdown (market value per sector)"""
+    aggregates = await _allocation_aggregates(settings, "Sector allocation")
+    return aggregates["sector"]
 
 @router.get("/allocations/asset")
-async def get_asset_allocation():
-    """Get asset type allocation breakdown"""
-    try:
-        # TODO: Implement with Schwab API
-        raise HTTPException(
-            status_code=501,
-            detail="Asset allocation - awaiting Schwab API integration"
-        )
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+async def get_asset_allocation(settings: Settings = Depends(get_settings)):
+    """Get asset type allocation breakdown (market value per asset type)"""
+    aggregates = await _allocation_aggregates(settings, "Asset allocation")
+    return aggregates["asset"]
\ No newline at end of file
@@ -0,0 +1,116 @@
+import zlib
+import zstandard
+from typing import Iterable
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+class CompressionMiddleware:
+    """
+    Compress responses with zstd or gzip, whichever the client accepts
+
+    zstd is preferred when offered: it compresses JSON better and faster
+    than gzip. Small bodies, responses that already carry a
+    Content-Encoding and excluded media types (e.g. Arrow streams) are
+    sent unchanged.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        excluded_media_types: Iterable[str] = (),
+        zstd_level: int = 3,
+        gzip_level: int = 6
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.excluded_media_types = frozenset(excluded_media_types)
+        self.zstd_level = zstd_level
+        self.gzip_level = gzip_level
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        accept_encoding = Headers(scope=scope).get("accept-encoding", "")
+        if "zstd" in accept_encoding:
+            encoding = "zstd"
+        elif "gzip" in accept_encoding:
+            encoding = "gzip"
+        else:
+            await self.app(scope, receive, send)
+            return
+
+        responder = _CompressionResponder(self, encoding, send)
+        await self.app(scope, receive, responder.send)
+
+
+class _CompressionResponder:
+    """Per-response state: holds back the start message until the first body chunk"""
+
+    def __init__(self, middleware: CompressionMiddleware, encoding: str, send: Send):
+        self.middleware = middleware
+        self.encoding = encoding
+        self._send = send
+        self.initial_message: Message = {}
+        self.started = False
+        self.passthrough = False
+        self.compressor = None
+
+    def _new_compressor(self):
+        if self.encoding == "zstd":
+            return zstandard.ZstdCompressor(level=self.middleware.zstd_level).compressobj()
+        # wbits=31 writes the gzip container rather than raw zlib
+        return zlib.compressobj(self.middleware.gzip_level, zlib.DEFLATED, 31)
+
+    async def send(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            self.initial_message = message
+            headers = Headers(raw=message["headers"])
+            media_type = headers.get("content-type", "").split(";")[0].strip()
+            self.passthrough = (
+                "content-encoding" in headers
+                or media_type in self.middleware.excluded_media_types
+            )
+            return
+
+        if message["type"] != "http.response.body":
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if not self.started:
+            self.started = True
+            if not more_body and len(body) < self.middleware.minimum_size:
+                self.passthrough = True
+            if self.passthrough:
+                await self._send(self.initial_message)
+                await self._send(message)
+                return
+
+            self.compressor = self._new_compressor()
+            headers = MutableHeaders(raw=self.initial_message["headers"])
+            headers["Content-Encoding"] = self.encoding
+            headers.add_vary_header("Accept-Encoding")
+
+            if more_body:
+                del headers["Content-Length"]
+                message["body"] = self.compressor.compress(body)
+            else:
+                message["body"] = self.compressor.compress(body) + self.compressor.flush()
+                headers["Content-Length"] = str(len(message["body"]))
+
+            await self._send(self.initial_message)
+            await self._send(message)
+            return
+
+        if not self.passthrough:
+            data = self.compressor.compress(body)
+            if not more_body:
+                data += self.compressor.flush()
+            message["body"] = data
+        await self._send(message)
@@ -1,5 +1,6 @@
-from pydantic_settings import BaseSettings
-from typing import List
+from functools import lru_cache
+from pydantic_settings import BaseSettings, SettingsConfigDict
+from typing import Tuple
 import os
 
 class Settings(BaseSettings):
@@ -16,21 +17,28 @@ class Settings(BaseSettings):
     DEBUG: bool = True
     
     # CORS
-    ALLOWED_ORIGINS: List[str] = [
+    ALLOWED_ORIGINS: Tuple[str, ...] = (
         "http://localhost:3000",
         "http://localhost:3001",
         "http://127.0.0.1:3000",
-    ]
+    )
     
     # Schwab API Configuration (to be filled when approved)
     SCHWAB_API_KEY: str = os.getenv("SCHWAB_API_KEY", "")
     SCHWAB_API_SECRET: str = os.getenv("SCHWAB_API_SECRET", "")
     SCHWAB_REDIRECT_URI: str = os.getenv("SCHWAB_REDIRECT_URI", "http://localhost:3000/callback")
     SCHWAB_BASE_URL: str = "https://api.schwab.com/v1"
+    # In-flight Schwab requests. They multiplex as streams over one HTTP/2
+    # connection, and httpx does not cap streams per connection itself, so
+    # keep this under the server's MAX_CONCURRENT_STREAMS (typically 100)
+    SCHWAB_MAX_CONCURRENCY: int = 20
     
     # Database (optional - for caching)
     DATABASE_URL: str = os.getenv("DATABASE_URL", "sqlite:///./investment_hub.db")
     
+    # Redis (shared market data cache)
+    REDIS_URL: str = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+    
     # Security
     SECRET_KEY: str = os.getenv("SECRET_KEY", "your-secret-key-change-in-production")
     ALGORITHM: str = "HS256"
@@ -38,6 +46,7 @@ class Settings(BaseSettings):
     
     # External APIs
     ALPHA_VANTAGE_API_KEY: str = os.getenv("ALPHA_VANTAGE_API_KEY", "")
+    ALPHA_VANTAGE_BASE_URL: str = "https://www.alphavantage.co/query"
     YAHOO_FINANCE_ENABLED: bool = True
     
     # ML Model Settings
@@ -50,8 +59,12 @@ class Settings(BaseSettings):
     # Logging
     LOG_LEVEL: str = "INFO"
     
-    class Config:
-        env_file = ".env"
-        case_sensitive = True
+    # Frozen so the settings object is immutable and hashable
+    model_config = SettingsConfigDict(env_file=".env", case_sensitive=True, frozen=True)
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Settings for this process, read from the environment and .env once"""
+    return Settings()
 
-settings = Settings()
\ No newline at end of file
+settings = get_settings()
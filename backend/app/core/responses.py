@@ -0,0 +1,18 @@
+import orjson
+from typing import Any
+from fastapi.responses import ORJSONResponse as _ORJSONResponse
+
+
+class ORJSONResponse(_ORJSONResponse):
+    """
+    orjson response used as the app's default response class
+
+    Serializes naive datetimes as UTC and NumPy arrays/scalars natively,
+    so analytics results don't need converting to Python lists first.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(
+            content,
+            option=orjson.OPT_NAIVE_UTC | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        )
@@ -1,5 +1,5 @@
-from pydantic import BaseModel, Field
-from typing import List, Optional
+from pydantic import BaseModel, ConfigDict, Field
+from typing import List, Optional, Literal
 from datetime import datetime
 from enum import Enum
 
@@ -20,6 +20,8 @@ class TransactionType(str, Enum):
 # Position Models
 class Position(BaseModel):
     """Position/Holding model"""
+    model_config = ConfigDict(frozen=True, extra="forbid", use_enum_values=True)
+
     symbol: str
     name: str
     quantity: float
@@ -42,6 +44,8 @@ class PositionDetail(Position):
 # Transaction Models
 class Transaction(BaseModel):
     """Transaction model"""
+    model_config = ConfigDict(frozen=True, extra="forbid", use_enum_values=True)
+
     id: str
     date: datetime
     symbol: str
@@ -54,6 +58,8 @@ class Transaction(BaseModel):
 # Portfolio Models
 class PortfolioSnapshot(BaseModel):
     """Portfolio snapshot at a point in time"""
+    model_config = ConfigDict(frozen=True, extra="forbid")
+
     date: datetime
     total_value: float
     cash_balance: float
@@ -102,6 +108,7 @@ class OptimizationRequest(BaseModel):
     risk_tolerance: float = Field(ge=0, le=1, description="Risk tolerance (0=conservative, 1=aggressive)")
     target_return: Optional[float] = None
     constraints: Optional[dict] = None
+    objective: Literal["mvp", "sharpe", "risk_parity", "tracking_error"] = "mvp"
 
 class OptimizationResponse(BaseModel):
     """Portfolio optimization results"""
@@ -123,6 +130,8 @@ class RiskAnalysis(BaseModel):
 # Market Data Models
 class StockQuote(BaseModel):
     """Stock quote data"""
+    model_config = ConfigDict(frozen=True, extra="forbid")
+
     symbol: str
     price: float
     change: float
@@ -134,6 +143,8 @@ class StockQuote(BaseModel):
 
 class MarketIndex(BaseModel):
     """Market index data"""
+    model_config = ConfigDict(frozen=True, extra="forbid")
+
     name: str
     symbol: str
     value: float
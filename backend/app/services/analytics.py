@@ -1,32 +1,311 @@
+import hashlib
+import heapq
 import numpy as np
-import pandas as pd
-from typing import List, Dict, Tuple
+import osqp
+from collections import OrderedDict
+from dataclasses import dataclass
+from numba import njit
+from scipy import sparse
+from scipy.linalg import cho_factor, cho_solve
+from scipy.optimize import minimize
+from typing import List, Dict, Tuple, Optional
 from datetime import datetime, timedelta
 from app.schemas.portfolio import (
     Position, PortfolioSnapshot, PerformanceMetrics,
     RiskAnalysis, OptimizationResponse
 )
+from app.services import fastmath
+from app.services.cov_gpu import compute_shrunk_cov
+
+# OSQP solvers keyed by a hash of (covariance, weight bounds). Reusing a
+# solver keeps its KKT factorization, so re-solving with a new risk
+# tolerance only updates the linear term q.
+_QP_SOLVER_CACHE: "OrderedDict[str, osqp.OSQP]" = OrderedDict()
+_QP_SOLVER_CACHE_SIZE = 32
+
+# Cholesky factors of covariance matrices, keyed by a hash of the matrix,
+# for the closed-form solves (O(n²) per solve once factored)
+_CHOLESKY_CACHE: "OrderedDict[str, Tuple[np.ndarray, bool]]" = OrderedDict()
+_CHOLESKY_CACHE_SIZE = 32
+
+# Constraint keys that cannot be expressed as linear QP constraints
+_NONLINEAR_CONSTRAINTS = {"max_volatility"}
+
+# Trading days looked back for the monthly return
+TRADING_DAYS_PER_MONTH = 21
+
+
+@njit(cache=True, fastmath=True)
+def _welford_cov(returns: np.ndarray) -> np.ndarray:
+    """Sample covariance of (observations x assets) in one streaming pass"""
+    n_obs, n_assets = returns.shape
+    mean = np.zeros(n_assets)
+    m2 = np.zeros((n_assets, n_assets))
+    delta = np.empty(n_assets)
+    
+    for t in range(n_obs):
+        for i in range(n_assets):
+            delta[i] = returns[t, i] - mean[i]
+            mean[i] += delta[i] / (t + 1)
+        for i in range(n_assets):
+            for j in range(n_assets):
+                m2[i, j] += delta[i] * (returns[t, j] - mean[j])
+    
+    return m2 / (n_obs - 1)
+
+
+def _to_arr(values: List[float]) -> np.ndarray:
+    """
+    Convert a price or return series for the scan kernels
+    
+    Single precision is ample for volatility, VaR and drawdown and halves
+    the bytes each pass moves; optimization keeps float64.
+    """
+    return np.asarray(values, dtype=np.float32)
+
+
+def _symmetric_to_dict(matrix: np.ndarray, symbols: List[str]) -> Dict[str, Dict[str, float]]:
+    """Nested {symbol: {symbol: value}} dict from a symmetric matrix"""
+    # Mirror the upper triangle so the output is exactly symmetric, then
+    # convert to Python floats in one tolist() call rather than per cell
+    rows = (np.triu(matrix) + np.triu(matrix, 1).T).tolist()
+    return {si: dict(zip(symbols, row)) for si, row in zip(symbols, rows)}
+
+
+@dataclass
+class PositionsArray:
+    """
+    Column-oriented (structure of arrays) view of positions
+    
+    Built once at the service boundary so aggregates over positions are
+    single vectorized passes. beta/volatility are NaN where unknown.
+    """
+    symbols: np.ndarray
+    quantity: np.ndarray
+    price: np.ndarray
+    cost_basis: np.ndarray
+    market_value: np.ndarray
+    gain_loss: np.ndarray
+    gain_loss_percent: np.ndarray
+    beta: np.ndarray
+    volatility: np.ndarray
+    
+    @classmethod
+    def from_positions(cls, positions: List[Position]) -> "PositionsArray":
+        n = len(positions)
+        
+        def column(attr: str) -> np.ndarray:
+            values = (getattr(p, attr, None) for p in positions)
+            return np.fromiter(
+                (np.nan if v is None else v for v in values), dtype=np.float64, count=n
+            )
+        
+        return cls(
+            symbols=np.array([p.symbol for p in positions], dtype=object),
+            quantity=column("quantity"),
+            price=column("current_price"),
+            cost_basis=column("cost_basis"),
+            market_value=column("market_value"),
+            gain_loss=column("gain_loss"),
+            gain_loss_percent=column("gain_loss_percent"),
+            beta=column("beta"),
+            volatility=column("volatility")
+        )
+    
+    def weights(self) -> np.ndarray:
+        """Portfolio weight of each position"""
+        return self.market_value / self.market_value.sum()
+
+
+class TailTracker:
+    """
+    Streaming historical VaR/CVaR for a growing returns history
+    
+    Returns are split into two heaps: the k+1 smallest (a max-heap, stored
+    negated, with a running sum) and the rest (a min-heap), where k is the
+    alpha tail index for the current count. A new return costs O(log n)
+    instead of re-partitioning the whole history; values match
+    fastmath.var_cvar on the same returns.
+    """
+    
+    def __init__(self, alpha: float = 0.05):
+        self.alpha = alpha
+        self._tail: List[float] = []
+        self._rest: List[float] = []
+        self._tail_sum = 0.0
+    
+    @classmethod
+    def from_returns(cls, returns: List[float], alpha: float = 0.05) -> "TailTracker":
+        """Build from an existing history with a single partition"""
+        tracker = cls(alpha)
+        r = np.asarray(returns, dtype=np.float64)
+        if r.shape[0]:
+            k = fastmath.tail_index(alpha, r.shape[0])
+            part = np.partition(r, k)
+            tracker._tail = (-part[:k + 1]).tolist()
+            tracker._rest = part[k + 1:].tolist()
+            heapq.heapify(tracker._tail)
+            heapq.heapify(tracker._rest)
+            tracker._tail_sum = float(part[:k + 1].sum())
+        return tracker
+    
+    def __len__(self) -> int:
+        return len(self._tail) + len(self._rest)
+    
+    def push(self, r: float) -> None:
+        """Add one return"""
+        r = float(r)
+        if self._tail and r < -self._tail[0]:
+            heapq.heappush(self._tail, -r)
+            self._tail_sum += r
+        else:
+            heapq.heappush(self._rest, r)
+        
+        # Grow or shrink the tail to k+1 entries for the new count
+        size = fastmath.tail_index(self.alpha, len(self)) + 1
+        while len(self._tail) > size:
+            moved = -heapq.heappop(self._tail)
+            self._tail_sum -= moved
+            heapq.heappush(self._rest, moved)
+        while len(self._tail) < size:
+            moved = heapq.heappop(self._rest)
+            self._tail_sum += moved
+            heapq.heappush(self._tail, -moved)
+    
+    def var(self) -> float:
+        """VaR as a signed return (losses are negative)"""
+        return -self._tail[0] if self._tail else 0.0
+    
+    def cvar(self) -> float:
+        """CVaR (mean of the tail) as a signed return"""
+        return self._tail_sum / len(self._tail) if self._tail else 0.0
+    
+    def tail_risk(self, alpha_narrow: float) -> Tuple[float, float, float, float]:
+        """
+        VaR and CVaR at the tracked level and at a narrower one
+        
+        The narrow tail lies inside the tracked one, so it is selected from
+        the k+1 tracked returns only, as in fastmath.tail_risk.
+        
+        Returns:
+            Tuple of (var, cvar, var_narrow, cvar_narrow) as signed returns
+        """
+        if not self._tail:
+            return 0.0, 0.0, 0.0, 0.0
+        k = min(fastmath.tail_index(alpha_narrow, len(self)), len(self._tail) - 1)
+        tail = np.partition(-np.asarray(self._tail), k)
+        return self.var(), self.cvar(), float(tail[k]), float(tail[:k + 1].mean())
+
 
 class PortfolioAnalytics:
     """Portfolio analytics and calculations service"""
     
+    @staticmethod
+    def compute_metrics(positions: PositionsArray) -> Dict[str, float]:
+        """
+        Calculate portfolio-level aggregates from position columns
+        
+        Returns:
+            Total value, cost, gain/loss (dollar and percent) and weighted
+            beta/volatility over positions where they are known
+        """
+        total_value = float(positions.market_value.sum())
+        total_cost = float((positions.quantity * positions.cost_basis).sum())
+        total_gain_loss = float(positions.gain_loss.sum())
+        weights = positions.weights()
+        
+        known_beta = ~np.isnan(positions.beta)
+        known_vol = ~np.isnan(positions.volatility)
+        
+        return {
+            "total_value": total_value,
+            "total_cost": total_cost,
+            "total_gain_loss": total_gain_loss,
+            "total_gain_loss_percent": total_gain_loss / total_cost * 100 if total_cost else 0.0,
+            "beta": float(
+                weights[known_beta] @ positions.beta[known_beta] / weights[known_beta].sum()
+            ) if known_beta.any() else 1.0,
+            "volatility": float(
+                weights[known_vol] @ positions.volatility[known_vol] / weights[known_vol].sum()
+            ) if known_vol.any() else 0.0
+        }
+    
+    @staticmethod
+    def calculate_portfolio_metrics(
+        positions: List[Position],
+        historical_values: List[float],
+        ytd_start: int = 0
+    ) -> PerformanceMetrics:
+        """
+        Calculate performance metrics for the portfolio summary
+        
+        Position aggregates (total return, beta) come from compute_metrics
+        over the column view; period returns, volatility, Sharpe ratio and
+        drawdown come from the value history.
+        
+        Args:
+            positions: Current positions
+            historical_values: Daily portfolio values, oldest first
+            ytd_start: Index in historical_values of the first value of the year
+        
+        Returns:
+            PerformanceMetrics; volatility falls back to the weighted position
+            volatility when there is no value history
+        """
+        aggregates = PortfolioAnalytics.compute_metrics(PositionsArray.from_positions(positions))
+        returns = PortfolioAnalytics.calculate_returns_arr(_to_arr(historical_values))
+        
+        def change_since(start: int) -> Tuple[float, float]:
+            # Dollar and percent change from historical_values[start] to the latest value
+            if len(historical_values) < 2:
+                return 0.0, 0.0
+            base = float(historical_values[min(max(start, 0), len(historical_values) - 1)])
+            diff = float(historical_values[-1]) - base
+            return diff, diff / base * 100 if base else 0.0
+        
+        last = len(historical_values) - 1
+        daily, daily_percent = change_since(last - 1)
+        monthly, monthly_percent = change_since(last - TRADING_DAYS_PER_MONTH)
+        ytd, ytd_percent = change_since(ytd_start)
+        
+        return PerformanceMetrics(
+            total_return=aggregates["total_gain_loss"],
+            total_return_percent=aggregates["total_gain_loss_percent"],
+            daily_return=daily,
+            daily_return_percent=daily_percent,
+            monthly_return=monthly,
+            monthly_return_percent=monthly_percent,
+            ytd_return=ytd,
+            ytd_return_percent=ytd_percent,
+            volatility=(
+                PortfolioAnalytics.calculate_volatility(returns)
+                if returns.shape[0] else aggregates["volatility"]
+            ),
+            sharpe_ratio=PortfolioAnalytics.calculate_sharpe_ratio(returns),
+            max_drawdown=PortfolioAnalytics.calculate_max_drawdown(historical_values),
+            beta=aggregates["beta"]
+        )
+    
     @staticmethod
     def calculate_returns(
         historical_values: List[float],
         period: str = "daily"
     ) -> List[float]:
         """Calculate returns for a series of portfolio values"""
-        values = np.array(historical_values)
-        returns = np.diff(values) / values[:-1]
-        return returns.tolist()
+        return PortfolioAnalytics.calculate_returns_arr(_to_arr(historical_values)).tolist()
+    
+    @staticmethod
+    def calculate_returns_arr(values: np.ndarray) -> np.ndarray:
+        """Simple returns of a value array, kept as an array for further calculations"""
+        return np.diff(values) / values[:-1]
     
     @staticmethod
     def calculate_volatility(returns: List[float], annualize: bool = True) -> float:
         """Calculate portfolio volatility (standard deviation of returns)"""
-        if not returns:
+        if len(returns) == 0:
             return 0.0
         
-        std = np.std(returns)
+        _, std = fastmath.mean_std(_to_arr(returns))
         
         if annualize:
             # Annualize assuming 252 trading days
@@ -46,16 +325,16 @@ class PortfolioAnalytics:
             returns: List of daily returns
             risk_free_rate: Annual risk-free rate (default 4%)
         """
-        if not returns:
+        if len(returns) == 0:
             return 0.0
         
-        returns_array = np.array(returns)
+        mean, std = fastmath.mean_std(_to_arr(returns))
         
         # Annualized return
-        mean_return = np.mean(returns_array) * 252
+        mean_return = mean * 252
         
         # Annualized volatility
-        volatility = np.std(returns_array) * np.sqrt(252)
+        volatility = std * np.sqrt(252)
         
         if volatility == 0:
             return 0.0
@@ -67,15 +346,46 @@ class PortfolioAnalytics:
     @staticmethod
     def calculate_max_drawdown(historical_values: List[float]) -> float:
         """Calculate maximum drawdown"""
-        if not historical_values:
+        if len(historical_values) == 0:
             return 0.0
         
-        values = np.array(historical_values)
-        peak = np.maximum.accumulate(values)
-        drawdown = (values - peak) / peak
-        max_dd = np.min(drawdown)
+        return fastmath.max_drawdown(_to_arr(historical_values)) * 100  # Return as percentage
+    
+    @staticmethod
+    def calculate_drawdown_periods(
+        historical_values: List[float],
+        dates: Optional[List[datetime]] = None
+    ) -> List[Dict]:
+        """
+        Find all drawdown periods
+        
+        Args:
+            historical_values: Portfolio value history
+            dates: Optional dates matching historical_values (indices are used otherwise)
         
-        return float(abs(max_dd) * 100)  # Return as percentage
+        Returns:
+            List of drawdowns with start, trough, recovery (None if ongoing),
+            depth (%), duration and recovery time (in periods)
+        """
+        if len(historical_values) < 2:
+            return []
+        
+        values = np.asarray(historical_values, dtype=np.float64)
+        starts, troughs, recoveries = fastmath.drawdown_periods(values)
+        label = (lambda i: dates[i]) if dates else (lambda i: int(i))
+        
+        periods = []
+        for start, trough, recovery in zip(starts, troughs, recoveries):
+            recovered = recovery >= 0
+            periods.append({
+                "start": label(start),
+                "trough": label(trough),
+                "recovery": label(recovery) if recovered else None,
+                "depth": float((1 - values[trough] / values[start]) * 100),
+                "duration": int(trough - start),
+                "recovery_time": int(recovery - trough) if recovered else None
+            })
+        return periods
     
     @staticmethod
     def calculate_var(
@@ -89,11 +399,10 @@ class PortfolioAnalytics:
             returns: List of returns
             confidence_level: Confidence level (0.95 for 95%, 0.99 for 99%)
         """
-        if not returns:
+        if len(returns) == 0:
             return 0.0
         
-        returns_array = np.array(returns)
-        var = np.percentile(returns_array, (1 - confidence_level) * 100)
+        var, _ = fastmath.var_cvar(_to_arr(returns), 1 - confidence_level)
         
         return float(abs(var) * 100)
     
@@ -109,19 +418,12 @@ class PortfolioAnalytics:
             returns: List of returns
             confidence_level: Confidence level
         """
-        if not returns:
+        if len(returns) == 0:
             return 0.0
         
-        returns_array = np.array(returns)
-        var_threshold = np.percentile(returns_array, (1 - confidence_level) * 100)
-        
-        # Average of returns below VaR threshold
-        tail_returns = returns_array[returns_array <= var_threshold]
+        # Average of returns at or below the VaR threshold
+        _, cvar = fastmath.var_cvar(_to_arr(returns), 1 - confidence_level)
         
-        if len(tail_returns) == 0:
-            return 0.0
-        
-        cvar = np.mean(tail_returns)
         return float(abs(cvar) * 100)
     
     @staticmethod
@@ -130,59 +432,474 @@ class PortfolioAnalytics:
         market_returns: List[float]
     ) -> float:
         """Calculate beta (systematic risk relative to market)"""
-        if not asset_returns or not market_returns:
+        if len(asset_returns) == 0 or len(market_returns) == 0:
             return 1.0
         
         # Ensure same length
         min_len = min(len(asset_returns), len(market_returns))
-        asset_returns = np.array(asset_returns[:min_len])
-        market_returns = np.array(market_returns[:min_len])
+        asset_returns = _to_arr(asset_returns[:min_len])
+        market_returns = _to_arr(market_returns[:min_len])
         
-        # Covariance between asset and market
-        covariance = np.cov(asset_returns, market_returns)[0][1]
+        # Covariance over market variance, fused into one kernel
+        return float(fastmath.beta(asset_returns, market_returns))
+    
+    @staticmethod
+    def correlation_matrix(
+        returns: np.ndarray,
+        symbols: List[str]
+    ) -> Dict[str, Dict[str, float]]:
+        """
+        Calculate correlation matrix with a single BLAS matrix multiply
         
-        # Variance of market
-        market_variance = np.var(market_returns)
+        Args:
+            returns: 2-D array of returns, one row per observation and one column per symbol
+            symbols: Symbol for each column
         
-        if market_variance == 0:
-            return 1.0
+        Returns:
+            Nested dict of correlations keyed by symbol pair
+        """
+        X = np.array(returns, dtype=np.float32, order="C")
+        if X.shape[0] < 2:
+            # A correlation needs at least two observations
+            return _symmetric_to_dict(np.zeros((X.shape[1], X.shape[1])), symbols)
         
-        beta = covariance / market_variance
-        return float(beta)
+        X -= X.mean(axis=0)
+        std = X.std(axis=0, ddof=1)
+        X /= np.where(std > 0, std, 1.0)
+        
+        C = np.dot(X.T, X) / (X.shape[0] - 1)
+        
+        return _symmetric_to_dict(C, symbols)
     
     @staticmethod
     def calculate_correlation_matrix(
         positions: List[Position],
         historical_prices: Dict[str, List[float]]
     ) -> Dict[str, Dict[str, float]]:
-        """Calculate correlation matrix between positions"""
-        symbols = [p.symbol for p in positions]
-        
-        # Create DataFrame of returns
-        returns_data = {}
-        for symbol in symbols:
-            if symbol in historical_prices and len(historical_prices[symbol]) > 1:
-                prices = np.array(historical_prices[symbol])
-                returns = np.diff(prices) / prices[:-1]
-                returns_data[symbol] = returns
-        
-        if not returns_data:
+        """
+        Calculate correlation matrix between positions
+        
+        Returns are computed for all symbols at once from a stacked price
+        matrix (aligned on the most recent common window) and passed to
+        correlation_matrix.
+        """
+        symbols = [
+            p.symbol for p in positions
+            if len(historical_prices.get(p.symbol, ())) > 1
+        ]
+        if not symbols:
+            return {}
+        
+        length = min(len(historical_prices[s]) for s in symbols)
+        if length < 3:
+            # Need at least two returns per symbol
             return {}
         
-        # Create DataFrame
-        df = pd.DataFrame(returns_data)
+        P = np.array([historical_prices[s][-length:] for s in symbols], dtype=np.float64)
+        R = np.diff(P, axis=1) / P[:, :-1]
+        
+        return PortfolioAnalytics.correlation_matrix(R.T, symbols)
+    
+    @staticmethod
+    def online_cov(returns: np.ndarray) -> np.ndarray:
+        """
+        Calculate covariance matrix with Welford's online algorithm
+        
+        Args:
+            returns: 2-D array of returns, one row per observation and one column per asset
+        
+        Returns:
+            Sample covariance; all zeros with fewer than two observations
+        """
+        returns = np.ascontiguousarray(returns, dtype=np.float64)
+        if returns.shape[0] < 2:
+            return np.zeros((returns.shape[1], returns.shape[1]))
+        return _welford_cov(returns)
+    
+    @staticmethod
+    def online_corr(returns: np.ndarray) -> np.ndarray:
+        """
+        Calculate correlation matrix from the online covariance
+        
+        Rows and columns of zero-variance assets (e.g. a constant price)
+        are 0, as in correlation_matrix, rather than NaN.
+        """
+        cov = PortfolioAnalytics.online_cov(returns)
+        std = np.sqrt(np.maximum(np.diag(cov), 0.0))
+        scale = np.where(std > 0, 1.0 / np.where(std > 0, std, 1.0), 0.0)
+        return cov * np.outer(scale, scale)
+    
+    @staticmethod
+    def estimate_returns_and_covariance(
+        historical_prices: Dict[str, List[float]],
+        symbols: List[str],
+        shrink: bool = True
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Estimate annualized mean returns and covariance matrix
+        
+        Price histories are aligned on their most recent common length.
+        
+        Args:
+            shrink: Use Ledoit-Wolf shrinkage (well-conditioned for short histories)
+                instead of the sample covariance
+        """
+        min_len = min(len(historical_prices[s]) for s in symbols)
+        prices = np.array([historical_prices[s][-min_len:] for s in symbols])
+        returns = np.diff(prices, axis=1) / prices[:, :-1]
+        
+        mu = returns.mean(axis=1) * 252
+        if shrink:
+            cov = compute_shrunk_cov(returns.T) * 252
+        else:
+            cov = PortfolioAnalytics.online_cov(returns.T) * 252
+        return mu, cov
+    
+    @staticmethod
+    def _weight_bounds(
+        n: int,
+        constraints: Optional[dict] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Per-asset weight bounds from optimization constraints (long-only by default)"""
+        constraints = constraints or {}
+        lower = np.full(n, float(constraints.get("min_weight", 0.0)))
+        upper = np.full(n, float(constraints.get("max_weight", 1.0)))
+        return lower, upper
+    
+    @staticmethod
+    def _setup_qp_solver(
+        P: np.ndarray,
+        lower: np.ndarray,
+        upper: np.ndarray
+    ) -> osqp.OSQP:
+        """Set up an OSQP solver for min ½x'Px + q'x s.t. 1'x=1, lower≤x≤upper"""
+        n = P.shape[0]
+        A = sparse.vstack([sparse.csc_matrix(np.ones((1, n))), sparse.eye(n)], format="csc")
+        l = np.concatenate([[1.0], lower])
+        u = np.concatenate([[1.0], upper])
+        
+        solver = osqp.OSQP()
+        solver.setup(
+            P=sparse.triu(sparse.csc_matrix(P), format="csc"), q=np.zeros(n), A=A, l=l, u=u,
+            verbose=False, warm_start=True, eps_abs=1e-8, eps_rel=1e-8
+        )
+        return solver
+    
+    @staticmethod
+    def _get_qp_solver(
+        P: np.ndarray,
+        lower: np.ndarray,
+        upper: np.ndarray
+    ) -> osqp.OSQP:
+        """
+        Get a cached OSQP solver for (P, bounds)
+        
+        Repeated solves with the same P reuse the factorization and warm
+        start from the previous solution.
+        """
+        key = hashlib.sha1(P.tobytes() + lower.tobytes() + upper.tobytes()).hexdigest()
+        solver = _QP_SOLVER_CACHE.get(key)
+        if solver is not None:
+            _QP_SOLVER_CACHE.move_to_end(key)
+            return solver
+        
+        solver = PortfolioAnalytics._setup_qp_solver(P, lower, upper)
+        _QP_SOLVER_CACHE[key] = solver
+        if len(_QP_SOLVER_CACHE) > _QP_SOLVER_CACHE_SIZE:
+            _QP_SOLVER_CACHE.popitem(last=False)
+        return solver
+    
+    @staticmethod
+    def solve_qp(
+        P: np.ndarray,
+        q: np.ndarray,
+        lower: np.ndarray,
+        upper: np.ndarray,
+        cache: bool = True
+    ) -> np.ndarray:
+        """
+        Solve min ½x'Px + q'x s.t. 1'x=1, lower≤x≤upper with OSQP
+        
+        Args:
+            cache: Reuse a cached solver for P (disable when P changes every call)
+        """
+        if cache:
+            solver = PortfolioAnalytics._get_qp_solver(P, lower, upper)
+        else:
+            solver = PortfolioAnalytics._setup_qp_solver(P, lower, upper)
+        solver.update(q=q)
+        result = solver.solve()
         
-        # Calculate correlation matrix
-        corr_matrix = df.corr()
+        # 1 = solved, 2 = solved inaccurate
+        if result.info.status_val not in (1, 2):
+            raise ValueError(f"Portfolio optimization failed: {result.info.status}")
         
-        # Convert to dictionary
-        return corr_matrix.to_dict()
+        # OSQP satisfies bounds only to within its tolerance (e.g. -1e-11 for a
+        # long-only weight), so snap the solution back into the box
+        return np.clip(result.x, lower, upper)
+    
+    @staticmethod
+    def scqp_solve(
+        objective_type: str,
+        mu: np.ndarray,
+        cov: np.ndarray,
+        b: Optional[np.ndarray] = None,
+        constraints: Optional[dict] = None,
+        risk_tolerance: float = 0.5,
+        max_iter: int = 100,
+        tol: float = 1e-6
+    ) -> np.ndarray:
+        """
+        Solve a portfolio objective as a sequence of QPs (SCQP)
+        
+        Every objective is reduced to QPs on the same OSQP backend;
+        non-QP objectives are linearized around the current iterate.
+        
+        Args:
+            objective_type: "mvp", "tracking_error", "sharpe" or "risk_parity"
+            mu: Annualized expected returns
+            cov: Annualized covariance matrix
+            b: Benchmark weights (tracking_error) or risk budgets (risk_parity)
+            constraints: Optional constraints dict (min_weight, max_weight, max_volatility)
+            risk_tolerance: 0 (minimum variance) to 1 (maximum return), for mvp/tracking_error
+            max_iter: Maximum SCQP iterations
+            tol: Convergence tolerance on ||x_{k+1} - x_k||
+        
+        Returns:
+            Portfolio weights
+        """
+        n = len(mu)
+        lam = risk_tolerance / max(1.0 - risk_tolerance, 1e-2)
+        lower, upper = PortfolioAnalytics._weight_bounds(n, constraints)
+        
+        if constraints and _NONLINEAR_CONSTRAINTS & constraints.keys():
+            if objective_type != "mvp":
+                raise ValueError(f"Non-linear constraints are not supported for '{objective_type}'")
+            return PortfolioAnalytics._solve_slsqp(mu, cov, lam, lower, upper, constraints)
+        
+        if objective_type == "mvp":
+            # Closed form is exact whenever no weight bound is active
+            weights = PortfolioAnalytics.closed_form_mvp(mu, cov, lam)
+            if weights is not None and np.all(weights >= lower) and np.all(weights <= upper):
+                return weights
+            return PortfolioAnalytics.solve_qp(cov, -lam * mu, lower, upper)
+        
+        if objective_type == "tracking_error":
+            # min ½(x-b)'Σ(x-b) − λμ'x
+            benchmark = b if b is not None else np.full(n, 1.0 / n)
+            return PortfolioAnalytics.solve_qp(cov, -cov @ benchmark - lam * mu, lower, upper)
+        
+        if objective_type == "sharpe":
+            return PortfolioAnalytics._scqp_sharpe(mu, cov, lower, upper, max_iter, tol)
+        
+        if objective_type == "risk_parity":
+            budget = b if b is not None else np.full(n, 1.0 / n)
+            if np.any(budget < 0):
+                raise ValueError("Risk budgets must not be negative")
+            return PortfolioAnalytics._scqp_risk_parity(cov, budget, lower, upper, max_iter, tol)
+        
+        raise ValueError(f"Unknown objective type: {objective_type}")
+    
+    @staticmethod
+    def _get_cholesky(cov: np.ndarray) -> Optional[Tuple[np.ndarray, bool]]:
+        """
+        Get a cached Cholesky factorization of Σ
+        
+        Sweeps over risk tolerance (e.g. the efficient frontier) factor Σ
+        once and then only pay for the triangular solves.
+        
+        Returns:
+            cho_factor result, or None if Σ is not positive definite
+        """
+        cov = np.ascontiguousarray(cov, dtype=np.float64)
+        key = hashlib.sha1(cov.tobytes() + str(cov.shape).encode()).hexdigest()
+        factor = _CHOLESKY_CACHE.get(key)
+        if factor is not None:
+            _CHOLESKY_CACHE.move_to_end(key)
+            return factor
+        
+        try:
+            factor = cho_factor(cov)
+        except np.linalg.LinAlgError:
+            return None
+        
+        _CHOLESKY_CACHE[key] = factor
+        if len(_CHOLESKY_CACHE) > _CHOLESKY_CACHE_SIZE:
+            _CHOLESKY_CACHE.popitem(last=False)
+        return factor
+    
+    @staticmethod
+    def closed_form_mvp(
+        mu: np.ndarray,
+        cov: np.ndarray,
+        lam: float
+    ) -> Optional[np.ndarray]:
+        """
+        Solve min ½w'Σw − λμ'w s.t. 1'w=1 in closed form
+        
+        With x = Σ⁻¹1 and y = Σ⁻¹μ (one Cholesky solve for both), the
+        minimum-variance portfolio is w_mv = x / 1'x and the solution is
+        w_mv + λ(y − (1'y) w_mv). Bounds are ignored.
+        
+        Returns:
+            Portfolio weights, or None if Σ is not positive definite
+        """
+        factor = PortfolioAnalytics._get_cholesky(cov)
+        if factor is None:
+            return None
+        
+        x, y = cho_solve(factor, np.column_stack([np.ones(len(mu)), mu])).T
+        
+        w_mv = x / x.sum()
+        return w_mv + lam * (y - y.sum() * w_mv)
+    
+    @staticmethod
+    def _scqp_sharpe(
+        mu: np.ndarray,
+        cov: np.ndarray,
+        lower: np.ndarray,
+        upper: np.ndarray,
+        max_iter: int,
+        tol: float
+    ) -> np.ndarray:
+        """
+        Maximize μ'x / √(x'Σx)
+        
+        Linearizing the denominator at x_k gives the mean-variance QP with
+        λ_k = x_k'Σx_k / μ'x_k; all iterations share one cached solver.
+        """
+        x = PortfolioAnalytics.solve_qp(cov, np.zeros(len(mu)), lower, upper)
+        
+        for _ in range(max_iter):
+            expected_return = mu @ x
+            if expected_return <= 0:
+                # No portfolio with positive return; minimum variance is the best we can do
+                break
+            
+            lam = (x @ cov @ x) / expected_return
+            x_next = PortfolioAnalytics.solve_qp(cov, -lam * mu, lower, upper)
+            converged = np.linalg.norm(x_next - x) < tol
+            x = x_next
+            if converged:
+                break
+        
+        return x
+    
+    @staticmethod
+    def _scqp_risk_parity(
+        cov: np.ndarray,
+        budget: np.ndarray,
+        lower: np.ndarray,
+        upper: np.ndarray,
+        max_iter: int,
+        tol: float,
+        damping: float = 1e-6
+    ) -> np.ndarray:
+        """
+        Match risk contributions to budgets: min Σ_i (x_i(Σx)_i/σ² − b_i)²
+        
+        Each iteration solves the Gauss-Newton QP of the residuals
+        linearized at x_k, with a small damping term for stability.
+        """
+        n = len(budget)
+        
+        # Start from inverse-volatility weights
+        x = 1.0 / np.sqrt(np.diag(cov))
+        x = x / x.sum()
+        
+        for _ in range(max_iter):
+            s = cov @ x
+            variance = x @ s
+            residuals = x * s / variance - budget
+            
+            # Jacobian of the residuals
+            jacobian = (
+                (np.diag(s) + x[:, None] * cov) / variance
+                - 2.0 * np.outer(x * s, s) / variance ** 2
+            )
+            
+            P = jacobian.T @ jacobian + damping * np.eye(n)
+            q = jacobian.T @ (residuals - jacobian @ x) - damping * x
+            x_next = PortfolioAnalytics.solve_qp(P, q, lower, upper, cache=False)
+            
+            converged = np.linalg.norm(x_next - x) < tol
+            x = x_next
+            if converged:
+                break
+        
+        return x
+    
+    @staticmethod
+    def _solve_slsqp(
+        mu: np.ndarray,
+        cov: np.ndarray,
+        lam: float,
+        lower: np.ndarray,
+        upper: np.ndarray,
+        constraints: dict
+    ) -> np.ndarray:
+        """General-purpose SLSQP solve for non-linear constraints"""
+        n = len(mu)
+        scipy_constraints = [{"type": "eq", "fun": lambda x: x.sum() - 1.0}]
+        
+        if "max_volatility" in constraints:
+            # Given in percent, like OptimizationResponse.expected_volatility
+            max_variance = (float(constraints["max_volatility"]) / 100) ** 2
+            scipy_constraints.append({
+                "type": "ineq",
+                "fun": lambda x: max_variance - x @ cov @ x
+            })
+        
+        result = minimize(
+            lambda x: 0.5 * x @ cov @ x - lam * mu @ x,
+            np.full(n, 1.0 / n),
+            jac=lambda x: cov @ x - lam * mu,
+            method="SLSQP",
+            bounds=list(zip(lower, upper)),
+            constraints=scipy_constraints
+        )
+        if not result.success:
+            raise ValueError(f"Portfolio optimization failed: {result.message}")
+        return result.x
+    
+    @staticmethod
+    def efficient_frontier(
+        historical_prices: Dict[str, List[float]],
+        n_points: int = 20,
+        constraints: Optional[dict] = None
+    ) -> List[Dict]:
+        """
+        Calculate points on the efficient frontier
+        
+        Sweeps risk tolerance over one cached OSQP solver, so only the
+        linear term changes between solves.
+        
+        Returns:
+            List of points with expected return, volatility (both %) and weights
+        """
+        symbols = list(historical_prices.keys())
+        mu, cov = PortfolioAnalytics.estimate_returns_and_covariance(historical_prices, symbols)
+        
+        points = []
+        for risk_tolerance in np.linspace(0.0, 0.99, n_points):
+            weights = PortfolioAnalytics.scqp_solve(
+                "mvp", mu, cov, constraints=constraints, risk_tolerance=risk_tolerance
+            )
+            points.append({
+                "expected_return": float(weights @ mu * 100),
+                "volatility": float(np.sqrt(weights @ cov @ weights) * 100),
+                "weights": dict(zip(symbols, weights.tolist()))
+            })
+        return points
     
     @staticmethod
     def optimize_portfolio(
         positions: List[Position],
         risk_tolerance: float = 0.5,
-        target_return: float = None
+        target_return: float = None,
+        historical_prices: Optional[Dict[str, List[float]]] = None,
+        constraints: Optional[dict] = None,
+        objective: str = "mvp"
     ) -> OptimizationResponse:
         """
         Optimize portfolio allocation using Modern Portfolio Theory
@@ -191,60 +908,83 @@ class PortfolioAnalytics:
             positions: Current positions
             risk_tolerance: 0 (conservative) to 1 (aggressive)
             target_return: Target annual return (optional)
+            historical_prices: Price history per symbol; enables mean-variance optimization
+                over the symbols that have one (held symbols without history are
+                reported with a recommended weight of 0)
+            constraints: Optional constraints dict (min_weight, max_weight, max_volatility,
+                benchmark_weights / risk_budget as {symbol: weight})
+            objective: "mvp", "sharpe", "risk_parity" or "tracking_error"
+        
+        Raises ValueError when benchmark_weights / risk_budget give no positive
+        total weight to the symbols with price history, or a risk budget is negative.
         """
-        # This is a simplified optimization
-        # In production, use scipy.optimize or PyPortfolioOpt
+        columns = PositionsArray.from_positions(positions)
+        symbol_list = columns.symbols.tolist()
+        current_weights = dict(zip(symbol_list, columns.weights().tolist()))
         
-        total_value = sum(p.market_value for p in positions)
-        current_weights = {
-            p.symbol: p.market_value / total_value 
-            for p in positions
-        }
+        symbols = [s for s in symbol_list if s in (historical_prices or {})]
+        if len(symbols) > 1:
+            mu, cov = PortfolioAnalytics.estimate_returns_and_covariance(historical_prices, symbols)
+            b = None
+            targets = (constraints or {}).get("benchmark_weights") or (constraints or {}).get("risk_budget")
+            if targets:
+                b = np.array([float(targets.get(s, 0.0)) for s in symbols])
+                if not b.sum() > 0:
+                    raise ValueError(
+                        "benchmark_weights/risk_budget must give a positive total weight "
+                        "to the symbols with price history"
+                    )
+                b = b / b.sum()
+            
+            weights = PortfolioAnalytics.scqp_solve(
+                objective, mu, cov, b=b, constraints=constraints, risk_tolerance=risk_tolerance
+            )
+            
+            expected_return = float(weights @ mu)
+            expected_volatility = float(np.sqrt(weights @ cov @ weights))
+            sharpe = expected_return / expected_volatility if expected_volatility > 0 else 0
+            
+            # Held positions without price history are left out of the
+            # optimization; list them explicitly at weight 0
+            recommended_weights = dict.fromkeys(symbol_list, 0.0)
+            recommended_weights.update(zip(symbols, weights.tolist()))
+            
+            return OptimizationResponse(
+                recommended_weights=recommended_weights,
+                expected_return=expected_return * 100,
+                expected_volatility=expected_volatility * 100,
+                sharpe_ratio=sharpe,
+                current_allocation=current_weights
+            )
         
+        # Without price history, fall back to a simple score-based heuristic
         # Mock optimization based on risk-adjusted returns
-        returns = {p.symbol: p.gain_loss_percent / 100 for p in positions}
+        returns = columns.gain_loss_percent / 100
         
         # Simple optimization: weight by Sharpe-like metric
-        # In production, use proper mean-variance optimization
-        scores = {}
-        for p in positions:
-            # Mock score based on return and volatility (assumed)
-            volatility = 0.20  # Mock 20% volatility
-            score = (p.gain_loss_percent / 100) / volatility
-            scores[p.symbol] = max(score, 0)
-        
-        total_score = sum(scores.values())
+        # Mock score based on return and volatility (assumed 20%)
+        scores = np.maximum(returns / 0.20, 0)
+        total_score = scores.sum()
+        equal_weight = 1.0 / len(positions)
         
         if total_score == 0:
             # Equal weight if no positive scores
-            recommended_weights = {s: 1.0 / len(positions) for s in scores.keys()}
+            weights = np.full(len(positions), equal_weight)
         else:
             # Weight by score, adjusted for risk tolerance
-            base_weights = {s: score / total_score for s, score in scores.items()}
+            weights = scores / total_score
             
             # Adjust for risk tolerance (more aggressive = more concentration)
             if risk_tolerance < 0.5:
                 # More conservative = more equal weights
-                equal_weight = 1.0 / len(positions)
-                recommended_weights = {
-                    s: w * risk_tolerance * 2 + equal_weight * (1 - risk_tolerance * 2)
-                    for s, w in base_weights.items()
-                }
-            else:
-                recommended_weights = base_weights
+                weights = weights * risk_tolerance * 2 + equal_weight * (1 - risk_tolerance * 2)
         
         # Normalize weights
-        total_weight = sum(recommended_weights.values())
-        recommended_weights = {
-            s: w / total_weight 
-            for s, w in recommended_weights.items()
-        }
+        weights = weights / weights.sum()
+        recommended_weights = dict(zip(symbol_list, weights.tolist()))
         
         # Calculate expected metrics
-        expected_return = sum(
-            returns.get(s, 0) * w 
-            for s, w in recommended_weights.items()
-        )
+        expected_return = float(returns @ weights)
         
         expected_volatility = 0.18  # Mock volatility
         sharpe = expected_return / expected_volatility if expected_volatility > 0 else 0
@@ -257,22 +997,83 @@ class PortfolioAnalytics:
             current_allocation=current_weights
         )
     
+    @staticmethod
+    def _var_cvar_vol(
+        returns: np.ndarray,
+        historical_values: np.ndarray,
+        tail: Optional[TailTracker] = None
+    ) -> Tuple[float, float, float, float, float]:
+        """
+        All scalar risk metrics from pre-built arrays
+        
+        The 95% and 99% tails come from one partition of the returns, or
+        from the tracker when one is kept for them.
+        
+        Returns:
+            Tuple of (var_95, var_99, cvar_95, volatility, max_drawdown), all in %
+        """
+        var_95 = var_99 = cvar_95 = volatility = 0.0
+        if returns.shape[0]:
+            if tail is not None:
+                tail_95, tail_cvar_95, tail_99, _ = tail.tail_risk(0.01)
+            else:
+                tail_95, tail_cvar_95, tail_99, _ = fastmath.tail_risk(returns, 0.05, 0.01)
+            var_95 = float(abs(tail_95) * 100)
+            var_99 = float(abs(tail_99) * 100)
+            cvar_95 = float(abs(tail_cvar_95) * 100)
+            _, std = fastmath.mean_std(returns)
+            volatility = float(std * np.sqrt(252) * 100)
+        
+        max_drawdown = fastmath.max_drawdown(historical_values) * 100
+        return var_95, var_99, cvar_95, volatility, max_drawdown
+    
     @staticmethod
     def calculate_risk_metrics(
         historical_values: List[float],
-        returns: List[float]
+        returns: Optional[List[float]] = None,
+        asset_returns: Optional[Dict[str, List[float]]] = None,
+        tail: Optional[TailTracker] = None
     ) -> RiskAnalysis:
-        """Calculate comprehensive risk metrics"""
-        var_95 = PortfolioAnalytics.calculate_var(returns, 0.95)
-        var_99 = PortfolioAnalytics.calculate_var(returns, 0.99)
-        cvar_95 = PortfolioAnalytics.calculate_cvar(returns, 0.95)
-        volatility = PortfolioAnalytics.calculate_volatility(returns)
-        max_drawdown = PortfolioAnalytics.calculate_max_drawdown(historical_values)
+        """
+        Calculate comprehensive risk metrics
+        
+        Args:
+            historical_values: Portfolio value history
+            returns: Portfolio returns (derived from historical_values if omitted)
+            asset_returns: Optional returns per symbol, used for the correlation matrix
+            tail: Optional 95% TailTracker kept up to date with the same returns
+                by a caller that pushes each new return; VaR/CVaR are read from
+                it instead of partitioning the whole history
+        """
+        # Each input is converted to an array exactly once; derived returns
+        # stay arrays rather than round-tripping through a list
+        values = _to_arr(historical_values)
+        if returns is None:
+            returns_array = PortfolioAnalytics.calculate_returns_arr(values)
+        else:
+            returns_array = _to_arr(returns)
+        if tail is not None and (tail.alpha != 0.05 or len(tail) != returns_array.shape[0]):
+            raise ValueError("tail must track the 95% level of exactly these returns")
+        
+        var_95, var_99, cvar_95, volatility, max_drawdown = PortfolioAnalytics._var_cvar_vol(
+            returns_array, values, tail
+        )
+        
+        correlation_matrix = None
+        if asset_returns and len(asset_returns) > 1:
+            symbols = list(asset_returns.keys())
+            min_len = min(len(asset_returns[s]) for s in symbols)
+            # A correlation needs at least two common observations
+            if min_len >= 2:
+                matrix = np.array([asset_returns[s][-min_len:] for s in symbols]).T
+                corr = PortfolioAnalytics.online_corr(matrix)
+                correlation_matrix = _symmetric_to_dict(corr, symbols)
         
         return RiskAnalysis(
             var_95=var_95,
             var_99=var_99,
             cvar_95=cvar_95,
             volatility=volatility,
-            max_drawdown=max_drawdown
+            max_drawdown=max_drawdown,
+            correlation_matrix=correlation_matrix
         )
\ No newline at end of file
@@ -0,0 +1,39 @@
+import functools
+from typing import Any, Awaitable, Callable, Union
+from app.services.shared_market_cache import shared_market_cache
+
+
+def cached(
+    kind: str,
+    key: Callable[..., str],
+    ttl: Union[int, Callable[..., int], None] = None
+):
+    """
+    Cache an async function's result in the shared Redis market cache
+
+    Args:
+        kind: Data type, for metrics and the default TTL (see TTL_SECONDS)
+        key: Builds the cache key from the call's arguments
+        ttl: Expiry in seconds, overriding the default for the data type;
+            may be a callable taking the call's arguments
+
+    Results that are None are not cached. Redis errors fall through to the
+    wrapped function, as in SharedMarketCache.
+    """
+    def decorator(func: Callable[..., Awaitable[Any]]):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            cache_key = key(*args, **kwargs)
+            value = await shared_market_cache.get(cache_key, kind)
+            if value is not None:
+                return value
+
+            value = await func(*args, **kwargs)
+            if value is not None:
+                expiry = ttl(*args, **kwargs) if callable(ttl) else ttl
+                await shared_market_cache.set(cache_key, value, kind, ttl=expiry)
+            return value
+
+        return wrapper
+
+    return decorator
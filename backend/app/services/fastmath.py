@@ -0,0 +1,271 @@
+import numpy as np
+from numba import njit, prange
+from typing import Tuple
+
+# Series longer than this are split across threads
+PARALLEL_THRESHOLD = 1_000_000
+
+
+@njit(cache=True, fastmath=True, nogil=True)
+def _max_drawdown_serial(equity: np.ndarray) -> float:
+    peak = equity[0]
+    max_dd = 0.0
+    for i in range(equity.shape[0]):
+        peak = max(peak, equity[i])
+        dd = equity[i] / peak - 1.0
+        if dd < max_dd:
+            max_dd = dd
+    return -max_dd
+
+
+@njit(cache=True, fastmath=True, parallel=True)
+def _max_drawdown_parallel(equity: np.ndarray, n_chunks: int) -> float:
+    n = equity.shape[0]
+    size = (n + n_chunks - 1) // n_chunks
+
+    # Pass 1: peak of each chunk
+    chunk_peaks = np.empty(n_chunks)
+    for c in prange(n_chunks):
+        start = c * size
+        end = min(start + size, n)
+        peak = equity[start]
+        for i in range(start, end):
+            peak = max(peak, equity[i])
+        chunk_peaks[c] = peak
+
+    # Pass 2: each chunk scans with the running peak of all previous chunks
+    chunk_dd = np.zeros(n_chunks)
+    for c in prange(n_chunks):
+        start = c * size
+        end = min(start + size, n)
+        peak = equity[start]
+        for k in range(c):
+            peak = max(peak, chunk_peaks[k])
+        max_dd = 0.0
+        for i in range(start, end):
+            peak = max(peak, equity[i])
+            dd = equity[i] / peak - 1.0
+            if dd < max_dd:
+                max_dd = dd
+        chunk_dd[c] = max_dd
+
+    return -chunk_dd.min()
+
+
+def max_drawdown(equity: np.ndarray) -> float:
+    """
+    Maximum drawdown of an equity curve
+
+    Returns:
+        Maximum peak-to-trough decline as a positive fraction (0.25 = 25%)
+    """
+    if equity.shape[0] == 0:
+        return 0.0
+    if equity.shape[0] > PARALLEL_THRESHOLD:
+        return float(_max_drawdown_parallel(equity, 64))
+    return float(_max_drawdown_serial(equity))
+
+
+@njit(cache=True, fastmath=True)
+def drawdown_periods(equity: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Find all drawdown periods of an equity curve
+
+    Returns:
+        Tuple of (start_idx, trough_idx, recovery_idx) arrays, one entry per
+        drawdown. start is the peak before the decline; recovery is the
+        first index back at or above that peak, or -1 if not yet recovered.
+    """
+    n = equity.shape[0]
+    starts = np.empty(n, dtype=np.int64)
+    troughs = np.empty(n, dtype=np.int64)
+    recoveries = np.empty(n, dtype=np.int64)
+    count = 0
+
+    peak_idx = 0
+    trough_idx = 0
+    in_drawdown = False
+
+    for i in range(1, n):
+        if equity[i] >= equity[peak_idx]:
+            if in_drawdown:
+                starts[count] = peak_idx
+                troughs[count] = trough_idx
+                recoveries[count] = i
+                count += 1
+                in_drawdown = False
+            peak_idx = i
+        else:
+            if not in_drawdown:
+                in_drawdown = True
+                trough_idx = i
+            elif equity[i] < equity[trough_idx]:
+                trough_idx = i
+
+    if in_drawdown:
+        starts[count] = peak_idx
+        troughs[count] = trough_idx
+        recoveries[count] = -1
+        count += 1
+
+    return starts[:count], troughs[:count], recoveries[:count]
+
+
+@njit(cache=True)
+def tail_index(alpha: float, n: int) -> int:
+    """Index of the alpha-quantile in a sample of n (floor of alpha·n)"""
+    # The epsilon absorbs rounding in alpha = 1 - confidence, e.g.
+    # (1 - 0.9) * 10 = 0.9999999999999998
+    k = int(np.floor(alpha * n + 1e-9))
+    return min(max(k, 0), n - 1)
+
+
+@njit(cache=True)
+def var_cvar(returns: np.ndarray, alpha: float) -> Tuple[float, float]:
+    """
+    Historical VaR and CVaR with a partial sort
+
+    Args:
+        returns: Returns (not modified)
+        alpha: Tail probability (0.05 for 95% confidence)
+
+    Returns:
+        Tuple of (var, cvar) as signed returns (losses are negative)
+    """
+    k = tail_index(alpha, returns.shape[0])
+    part = np.partition(returns, k)
+    return part[k], part[:k + 1].mean()
+
+
+@njit(cache=True)
+def tail_risk(
+    returns: np.ndarray,
+    alpha_wide: float,
+    alpha_narrow: float
+) -> Tuple[float, float, float, float]:
+    """
+    VaR and CVaR at two tail levels from a single partition of the returns
+
+    The wide tail is partitioned once; the narrow tail is selected within
+    that (much smaller) slice.
+
+    Returns:
+        Tuple of (var_wide, cvar_wide, var_narrow, cvar_narrow)
+    """
+    n = returns.shape[0]
+    k_wide = tail_index(alpha_wide, n)
+    k_narrow = tail_index(alpha_narrow, n)
+
+    part = np.partition(returns, k_wide)
+    tail = np.partition(part[:k_wide + 1], k_narrow)
+    return part[k_wide], tail.mean(), tail[k_narrow], tail[:k_narrow + 1].mean()
+
+
+@njit(cache=True, fastmath=True, nogil=True)
+def zscore_last(prices: np.ndarray) -> Tuple[float, float]:
+    """
+    Z-score of the latest return against all earlier returns
+
+    Returns are computed on the fly and their mean/variance accumulated
+    with Welford's algorithm, so no returns array is allocated.
+
+    Returns:
+        Tuple of (signed z-score, latest return); z-score is 0 when
+        earlier returns have no variance
+    """
+    n = prices.shape[0]
+    mean = 0.0
+    m2 = 0.0
+    count = 0
+    for i in range(1, n - 1):
+        r = (prices[i] - prices[i - 1]) / prices[i - 1]
+        count += 1
+        delta = r - mean
+        mean += delta / count
+        m2 += delta * (r - mean)
+
+    last = (prices[n - 1] - prices[n - 2]) / prices[n - 2]
+    std = np.sqrt(m2 / count) if count > 0 else 0.0
+    if std > 0:
+        return (last - mean) / std, last
+    return 0.0, last
+
+
+@njit(cache=True, fastmath=True)
+def ewma_var(returns: np.ndarray, lam: float) -> float:
+    """
+    Exponentially weighted mean of squared returns
+
+    Weights are lam**age (the latest return has age 0), normalized to sum
+    to one. Computed with the recurrence s = lam*s + r², so no weight or
+    squared-returns array is built.
+    """
+    s = 0.0
+    for i in range(returns.shape[0]):
+        s = lam * s + returns[i] * returns[i]
+    total_weight = (1.0 - lam ** returns.shape[0]) / (1.0 - lam)
+    return s / total_weight
+
+
+@njit(cache=True, fastmath=True)
+def mean_std(values: np.ndarray) -> Tuple[float, float]:
+    """
+    Mean and population std in two passes over the input and no temporaries
+
+    np.mean followed by np.std reads the data three times (np.std
+    recomputes the mean) and allocates the deviations array.
+    """
+    n = values.shape[0]
+    mean = 0.0
+    for i in range(n):
+        mean += values[i]
+    mean /= n
+
+    ss = 0.0
+    for i in range(n):
+        d = values[i] - mean
+        ss += d * d
+    return mean, np.sqrt(ss / n)
+
+
+@njit(cache=True, fastmath=True)
+def beta(asset: np.ndarray, market: np.ndarray) -> float:
+    """
+    Beta of asset returns against market returns (Σ(a-ā)(m-m̄) / Σ(m-m̄)²)
+
+    Both means in one pass, then covariance and market variance together
+    in a second, instead of np.cov and np.var walking the data separately.
+    Returns 1.0 when the market has no variance.
+    """
+    n = asset.shape[0]
+    a_mean = 0.0
+    m_mean = 0.0
+    for i in range(n):
+        a_mean += asset[i]
+        m_mean += market[i]
+    a_mean /= n
+    m_mean /= n
+
+    sxy = 0.0
+    sxx = 0.0
+    for i in range(n):
+        dm = market[i] - m_mean
+        sxy += (asset[i] - a_mean) * dm
+        sxx += dm * dm
+    return sxy / sxx if sxx > 0 else 1.0
+
+
+def warmup():
+    """Compile all kernels on tiny inputs so the first request pays no JIT cost"""
+    # Analytics and ML inputs are float32; optimization paths use float64
+    for dtype in (np.float64, np.float32):
+        sample = np.array([1.0, 0.9, 1.1, 1.0], dtype=dtype)
+        _max_drawdown_serial(sample)
+        _max_drawdown_parallel(sample, 2)
+        drawdown_periods(sample)
+        var_cvar(sample, 0.05)
+        tail_risk(sample, 0.05, 0.01)
+        zscore_last(sample)
+        ewma_var(sample, 0.5)
+        mean_std(sample)
+        beta(sample, sample)
@@ -0,0 +1,32 @@
+import httpx
+from app.core.config import settings
+
+# Shared connection pool for all outbound API calls. Reusing it keeps
+# TCP/TLS connections alive across requests and lets concurrent requests
+# multiplex over HTTP/2. Relative URLs resolve against the Schwab API;
+# other providers pass absolute URLs.
+#
+# The pool is sized for wide fan-outs (portfolio refreshes); per-provider
+# concurrency is capped by the callers. Idle connections are kept for 30s,
+# long enough to span consecutive page loads. Connects fail fast so a
+# down provider does not hold requests for the whole read timeout; failed
+# connection attempts are retried by the transport.
+client = httpx.AsyncClient(
+    base_url=settings.SCHWAB_BASE_URL,
+    timeout=httpx.Timeout(10.0, connect=5.0),
+    # With an explicit transport, HTTP/2 and pool limits are set on it
+    transport=httpx.AsyncHTTPTransport(
+        http2=True,
+        retries=3,
+        limits=httpx.Limits(
+            max_connections=1000,
+            max_keepalive_connections=100,
+            keepalive_expiry=30.0
+        )
+    )
+)
+
+
+async def close():
+    """Close the shared client (call from app shutdown)"""
+    await client.aclose()
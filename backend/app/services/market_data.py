@@ -0,0 +1,271 @@
+import asyncio
+import numpy as np
+import orjson
+import pyarrow as pa
+import yfinance as yf
+from async_lru import alru_cache
+from prometheus_client.core import REGISTRY, CounterMetricFamily, GaugeMetricFamily
+from typing import List, Dict, Iterator, Optional
+from app.core.config import settings
+from app.schemas.portfolio import StockQuote
+from app.services import http
+from app.services.shared_market_cache import shared_market_cache, quote_key, history_key, fundamentals_key
+from app.services.symbol_search import get_symbol_index
+
+PROVIDER = "alphavantage"
+HISTORY_PROVIDER = "yahoo"
+
+# Maximum symbols per AlphaVantage batch quote request
+ALPHA_VANTAGE_BATCH_LIMIT = 100
+
+# In-process (L1) cache settings for slow-changing data
+LRU_MAXSIZE = 10_000
+LRU_TTL_SECONDS = 900
+
+# AlphaVantage OVERVIEW fields returned by /fundamentals
+_FUNDAMENTAL_FIELDS = {
+    "market_cap": "MarketCapitalization",
+    "pe_ratio": "PERatio",
+    "dividend_yield": "DividendYield",
+    "eps": "EPS",
+    "book_value": "BookValue",
+    "roe": "ReturnOnEquityTTM",
+    "roa": "ReturnOnAssetsTTM",
+    "profit_margin": "ProfitMargin",
+}
+
+
+# OHLCV columns returned by /history; timestamps are Unix seconds (UTC)
+HISTORY_COLUMNS = ("timestamp", "open", "high", "low", "close", "volume")
+
+HISTORY_SCHEMA = pa.schema([
+    ("timestamp", pa.timestamp("s", tz="UTC")),
+    ("open", pa.float64()),
+    ("high", pa.float64()),
+    ("low", pa.float64()),
+    ("close", pa.float64()),
+    ("volume", pa.int64()),
+])
+
+# Rows per Arrow record batch when streaming history
+ARROW_BATCH_ROWS = 65_536
+ARROW_STREAM_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+
+
+def _to_float(value: Optional[str]) -> Optional[float]:
+    """Parse an AlphaVantage numeric string ("None", "-" and "" mean missing)"""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+async def _alpha_vantage_query(function: str, **params) -> Dict:
+    if not settings.ALPHA_VANTAGE_API_KEY:
+        raise RuntimeError("ALPHA_VANTAGE_API_KEY is not configured")
+
+    response = await http.client.get(
+        settings.ALPHA_VANTAGE_BASE_URL,
+        params={"function": function, "apikey": settings.ALPHA_VANTAGE_API_KEY, **params}
+    )
+    response.raise_for_status()
+    return orjson.loads(response.content)
+
+
+@alru_cache(maxsize=LRU_MAXSIZE, ttl=LRU_TTL_SECONDS)
+async def _fetch_fundamentals(symbol: str) -> Dict:
+    """Fundamentals from the shared Redis cache, else AlphaVantage"""
+    key = fundamentals_key(PROVIDER, symbol)
+    cached = await shared_market_cache.get(key, "fundamentals")
+    if cached is not None:
+        return cached
+
+    data = await _alpha_vantage_query("OVERVIEW", symbol=symbol)
+    fundamentals = {"symbol": symbol, "name": data.get("Name")}
+    fundamentals.update({
+        field: _to_float(data.get(source)) for field, source in _FUNDAMENTAL_FIELDS.items()
+    })
+
+    await shared_market_cache.set(key, fundamentals, "fundamentals")
+    return fundamentals
+
+
+def _download_history(symbol: str, period: str, interval: str) -> Dict[str, List]:
+    """Blocking yfinance download, returned column-wise"""
+    df = yf.Ticker(symbol).history(period=period, interval=interval, auto_adjust=False)
+    if df.empty:
+        return {column: [] for column in HISTORY_COLUMNS}
+
+    return {
+        "timestamp": (df.index.asi8 // 1_000_000_000).tolist(),
+        "open": df["Open"].to_numpy(dtype=np.float64).tolist(),
+        "high": df["High"].to_numpy(dtype=np.float64).tolist(),
+        "low": df["Low"].to_numpy(dtype=np.float64).tolist(),
+        "close": df["Close"].to_numpy(dtype=np.float64).tolist(),
+        "volume": df["Volume"].to_numpy(dtype=np.int64).tolist(),
+    }
+
+
+def history_to_arrow_stream(history: Dict[str, List]) -> Iterator[bytes]:
+    """
+    Encode column-wise OHLCV history as an Arrow IPC stream
+
+    Yields the schema message, one message per record batch, then the
+    end-of-stream marker, so the response body is written batch by batch
+    instead of being built as one JSON document.
+    """
+    table = pa.table(
+        {column: history[column] for column in HISTORY_COLUMNS},
+        schema=HISTORY_SCHEMA
+    )
+    yield HISTORY_SCHEMA.serialize().to_pybytes()
+    for batch in table.to_batches(max_chunksize=ARROW_BATCH_ROWS):
+        yield batch.serialize().to_pybytes()
+    yield b"\xff\xff\xff\xff\x00\x00\x00\x00"
+
+
+@alru_cache(maxsize=LRU_MAXSIZE, ttl=LRU_TTL_SECONDS)
+async def _search_symbols(query: str, limit: int) -> List[Dict]:
+    index = await get_symbol_index()
+    return index.search(query, limit)
+
+
+class _LRUCacheCollector:
+    """Exports the in-process cache statistics on /metrics"""
+
+    def collect(self):
+        hits = CounterMetricFamily("market_lru_cache_hits", "In-process market cache hits", labels=["cache"])
+        misses = CounterMetricFamily("market_lru_cache_misses", "In-process market cache misses", labels=["cache"])
+        size = GaugeMetricFamily("market_lru_cache_size", "In-process market cache entries", labels=["cache"])
+
+        for name, func in (("fundamentals", _fetch_fundamentals), ("search", _search_symbols)):
+            info = func.cache_info()
+            hits.add_metric([name], info.hits)
+            misses.add_metric([name], info.misses)
+            size.add_metric([name], info.currsize)
+
+        yield hits
+        yield misses
+        yield size
+
+
+REGISTRY.register(_LRUCacheCollector())
+
+
+class MarketDataService:
+    """
+    Market data service for quotes and prices
+
+    Quotes for many symbols are fetched with the provider's batch endpoint
+    (one request per chunk of symbols) instead of one request per symbol.
+    Quotes are served from the shared market cache when fresh; fundamentals
+    and search results are also kept in an in-process LRU for 15 minutes.
+    """
+
+    async def batch_quotes(self, symbols: List[str]) -> List[StockQuote]:
+        """
+        Get quotes for multiple symbols using batch requests
+
+        Args:
+            symbols: List of ticker symbols
+
+        Returns:
+            List of StockQuote in request order (unknown symbols are omitted)
+        """
+        if not symbols:
+            return []
+
+        keys = [quote_key(PROVIDER, s) for s in symbols]
+        cached = await shared_market_cache.get_many(keys, "quote")
+        quotes = {
+            symbol: StockQuote(**value)
+            for symbol, value in zip(symbols, cached)
+            if value is not None
+        }
+
+        missing = [s for s in symbols if s not in quotes]
+        if missing:
+            chunks = [
+                missing[i:i + ALPHA_VANTAGE_BATCH_LIMIT]
+                for i in range(0, len(missing), ALPHA_VANTAGE_BATCH_LIMIT)
+            ]
+            # A failed chunk cancels the others: the request fails either way.
+            # Re-raise the first failure itself rather than the ExceptionGroup,
+            # so callers see the provider or configuration error
+            try:
+                async with asyncio.TaskGroup() as tg:
+                    tasks = [tg.create_task(self._fetch_batch(chunk)) for chunk in chunks]
+            except* Exception as eg:
+                raise eg.exceptions[0]
+            fetched = {quote.symbol: quote for task in tasks for quote in task.result()}
+
+            await shared_market_cache.set_many(
+                {quote_key(PROVIDER, s): q.model_dump() for s, q in fetched.items()},
+                "quote"
+            )
+            quotes.update(fetched)
+
+        return [quotes[s] for s in symbols if s in quotes]
+
+    async def _fetch_batch(self, symbols: List[str]) -> List[StockQuote]:
+        """
+        Fetch one batch of quotes from AlphaVantage
+
+        Endpoint: GET /query?function=BATCH_STOCK_QUOTES&symbols=...
+        """
+        data = await _alpha_vantage_query("BATCH_STOCK_QUOTES", symbols=",".join(symbols))
+
+        return [self._parse_quote(item) for item in data.get("Stock Quotes", [])]
+
+    @staticmethod
+    def _parse_quote(item: Dict) -> StockQuote:
+        """Map an AlphaVantage batch quote entry to StockQuote"""
+        volume = item.get("3. volume", "0")
+        return StockQuote(
+            symbol=item.get("1. symbol", ""),
+            price=float(item.get("2. price", 0)),
+            change=0.0,  # Not provided by the batch endpoint
+            change_percent=0.0,
+            volume=int(volume) if volume not in ("", "--") else 0
+        )
+
+    async def get_price_history(self, symbol: str, period: str, interval: str) -> Dict[str, List]:
+        """
+        Get OHLCV history for a symbol
+
+        Args:
+            symbol: Stock ticker
+            period: Time period (1d, 5d, 1mo, 3mo, 6mo, 1y, 2y, 5y, max)
+            interval: Data interval (1m, 5m, 15m, 1h, 1d, 1wk, 1mo)
+
+        Returns:
+            Dict of equal-length column lists keyed by HISTORY_COLUMNS
+        """
+        symbol = symbol.strip().upper()
+        key = history_key(HISTORY_PROVIDER, symbol, period, interval)
+        cached = await shared_market_cache.get(key, "history")
+        if cached is not None:
+            return cached
+
+        history = await asyncio.to_thread(_download_history, symbol, period, interval)
+        await shared_market_cache.set(key, history, "history")
+        return history
+
+    async def fetch_fundamentals(self, symbol: str) -> Dict:
+        """
+        Get fundamental data for a symbol
+
+        Returns:
+            Market cap, P/E, dividend yield, EPS, book value, ROE, ROA and
+            profit margin (None where not reported)
+        """
+        return await _fetch_fundamentals(symbol.strip().upper())
+
+    async def search_symbols(self, query: str, limit: int = 10) -> List[Dict]:
+        """
+        Search for symbols by ticker or company name
+
+        Returns:
+            Up to `limit` matches with symbol, name, type and exchange
+        """
+        return await _search_symbols(query.strip().lower(), limit)
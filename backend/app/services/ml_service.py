@@ -1,11 +1,152 @@
+import os
 import numpy as np
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from sklearn.ensemble import RandomForestRegressor, IsolationForest
 from sklearn.preprocessing import StandardScaler
-from typing import List, Dict, Tuple
+from typing import List, Dict, Tuple, Union, Optional
 from datetime import datetime, timedelta
 from app.schemas.portfolio import (
     Position, PricePrediction, PortfolioRecommendation, AnomalyDetection
 )
+from app.services import fastmath
+
+# Model inputs are single precision: half the memory traffic of float64,
+# well inside the noise of a price or volatility forecast
+INPUT_DTYPE = np.float32
+
+# Prices identify_patterns needs: 100 returns for the long-term volatility
+PATTERN_LOOKBACK = 101
+
+
+def _rolling_mean(x: np.ndarray, window: int) -> np.ndarray:
+    """Rolling mean ('valid' positions only) by differencing a cumulative sum"""
+    # Accumulate in float64 so differences of large sums stay exact
+    cs = np.concatenate(([0.0], np.cumsum(x, dtype=np.float64)))
+    return ((cs[window:] - cs[:-window]) / window).astype(x.dtype, copy=False)
+
+
+def _rolling_std(cs: np.ndarray, cs2: np.ndarray, window: int) -> np.ndarray:
+    """
+    Population std of x[max(0, i-window):i] for every i in 1..len(x)
+    
+    Takes the running sums of x and x² (each with a leading 0) and uses
+    Var = E[x²] − E[x]², so the cost is O(n) whatever the window; early
+    windows are shorter than `window`.
+    """
+    end = np.arange(1, len(cs))
+    start = np.maximum(end - window, 0)
+    k = end - start
+    mean = (cs[end] - cs[start]) / k
+    var = (cs2[end] - cs2[start]) / k - mean ** 2
+    return np.sqrt(np.maximum(var, 0.0)).astype(INPUT_DTYPE, copy=False)
+
+
+def _log_returns(prices: np.ndarray) -> np.ndarray:
+    """Log returns: a vectorized log and a subtract, no per-element divide"""
+    return np.diff(np.log(prices))
+
+
+def _trailing_mean(x: np.ndarray, window: int) -> float:
+    """Mean of the last `window` values (the final point of a rolling mean)"""
+    return float(x[-window:].mean(dtype=np.float64))
+
+
+@dataclass
+class PriceSeries:
+    """
+    Prices with their log returns and cumulative return moments
+    
+    Built once per symbol and passed to several MLService methods, so the
+    list conversion and the returns pass are not repeated per method.
+    Daily log returns differ from simple returns only at second order and
+    add across horizons. cs_r / cs_r2 are running sums of returns and squared returns (float64,
+    with a leading 0), which give the mean/std of any window in O(1).
+    """
+    prices: np.ndarray
+    returns: np.ndarray
+    cs_r: np.ndarray
+    cs_r2: np.ndarray
+    
+    @classmethod
+    def from_list(cls, prices: List[float]) -> "PriceSeries":
+        prices = np.asarray(prices, dtype=INPUT_DTYPE)
+        returns = _log_returns(prices)
+        return cls(
+            prices=prices,
+            returns=returns,
+            cs_r=np.concatenate(([0.0], np.cumsum(returns, dtype=np.float64))),
+            cs_r2=np.concatenate(([0.0], np.cumsum(np.square(returns, dtype=np.float64))))
+        )
+    
+    def __len__(self) -> int:
+        return len(self.prices)
+    
+    def window_mean_std(self, window: int) -> Tuple[float, float]:
+        """Mean and population std of the last `window` returns"""
+        end = len(self.returns)
+        start = max(end - window, 0)
+        k = end - start
+        if k == 0:
+            return 0.0, 0.0
+        mean = (self.cs_r[end] - self.cs_r[start]) / k
+        var = (self.cs_r2[end] - self.cs_r2[start]) / k - mean ** 2
+        return float(mean), float(np.sqrt(max(var, 0.0)))
+
+
+class RollingMoments:
+    """
+    Mean and variance of the last `window` returns, updated in O(1)
+    
+    Welford's update on insert, extended to remove the value that drops
+    out of the window, so a forecast costs the same whatever the length
+    of the history behind it.
+    """
+    
+    def __init__(self, window: int = 30):
+        self.window = window
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.buf: deque = deque()
+    
+    @classmethod
+    def from_returns(cls, returns: List[float], window: int = 30) -> "RollingMoments":
+        moments = cls(window)
+        for r in returns[-window:]:
+            moments.push(float(r))
+        return moments
+    
+    def push(self, r: float) -> None:
+        """Add the latest return, evicting the oldest once the window is full"""
+        if len(self.buf) < self.window:
+            self.buf.append(r)
+            delta = r - self.mean
+            self.mean += delta / len(self.buf)
+            self.m2 += delta * (r - self.mean)
+            return
+        
+        old = self.buf.popleft()
+        self.buf.append(r)
+        old_mean = self.mean
+        self.mean += (r - old) / self.window
+        self.m2 += (r - old) * (r - self.mean + old - old_mean)
+    
+    def __len__(self) -> int:
+        return len(self.buf)
+    
+    def std(self) -> float:
+        """Population std of the window"""
+        if not self.buf:
+            return 0.0
+        return float(np.sqrt(max(self.m2 / len(self.buf), 0.0)))
+
+
+def _as_series(historical_prices: Union[List[float], PriceSeries]) -> PriceSeries:
+    if isinstance(historical_prices, PriceSeries):
+        return historical_prices
+    return PriceSeries.from_list(historical_prices)
+
 
 class MLService:
     """Machine Learning service for predictions and insights"""
@@ -18,7 +159,7 @@ class MLService:
     def predict_price(
         self,
         symbol: str,
-        historical_prices: List[float],
+        historical_prices: Union[List[float], PriceSeries],
         horizons: List[int] = [1, 7, 30]
     ) -> PricePrediction:
         """
@@ -26,15 +167,17 @@ class MLService:
         
         Args:
             symbol: Stock symbol
-            historical_prices: List of historical prices
+            historical_prices: Historical prices (list or PriceSeries)
             horizons: Prediction horizons in days
             
         Returns:
             PricePrediction with forecasts
         """
-        if len(historical_prices) < 30:
+        series = _as_series(historical_prices)
+        
+        if len(series) < 30:
             # Not enough data for prediction
-            current_price = historical_prices[-1] if historical_prices else 0
+            current_price = float(series.prices[-1]) if len(series) else 0
             return PricePrediction(
                 symbol=symbol,
                 current_price=current_price,
@@ -43,23 +186,60 @@ class MLService:
                 model_used="insufficient_data"
             )
         
-        # Prepare features
-        prices = np.array(historical_prices)
-        current_price = prices[-1]
+        current_price = series.prices[-1]
         
         # Create features: moving averages, momentum, volatility
-        features = self._create_price_features(prices)
+        features = self._create_price_features(series)
         
         # Simple prediction using last known trend
         # In production, use LSTM, ARIMA, or Prophet
-        returns = np.diff(prices) / prices[:-1]
-        avg_return = np.mean(returns[-30:])  # Last 30 days average return
-        volatility = np.std(returns[-30:])
+        avg_return, volatility = series.window_mean_std(30)  # Last 30 days
+        
+        return self._trend_prediction(symbol, current_price, avg_return, volatility, horizons)
+    
+    def predict_price_incremental(
+        self,
+        symbol: str,
+        current_price: float,
+        moments: RollingMoments,
+        horizons: List[int] = [1, 7, 30]
+    ) -> PricePrediction:
+        """
+        Same forecast as predict_price from a rolling 30-day window
         
+        For callers that keep a RollingMoments per symbol and push each new
+        return as it arrives; the history itself is never touched.
+        
+        Args:
+            symbol: Stock symbol
+            current_price: Latest price
+            moments: Rolling moments of recent returns
+            horizons: Prediction horizons in days
+        """
+        if len(moments) < moments.window:
+            return PricePrediction(
+                symbol=symbol,
+                current_price=current_price,
+                predicted_prices={f"{h}d": current_price for h in horizons},
+                confidence=0.0,
+                model_used="insufficient_data"
+            )
+        
+        return self._trend_prediction(symbol, current_price, moments.mean, moments.std(), horizons)
+    
+    def _trend_prediction(
+        self,
+        symbol: str,
+        current_price: float,
+        avg_return: float,
+        volatility: float,
+        horizons: List[int]
+    ) -> PricePrediction:
+        """Extrapolate the average log return over each horizon"""
         predicted_prices = {}
         for horizon in horizons:
-            # Simple prediction: current + trend * horizon with some noise
-            predicted = current_price * (1 + avg_return * horizon)
+            # Log returns compound additively: price * exp(mean * horizon)
+            predicted = current_price * np.exp(avg_return * horizon)
             predicted_prices[f"{horizon}d"] = float(predicted)
         
         # Confidence based on volatility (lower volatility = higher confidence)
@@ -77,7 +257,7 @@ class MLService:
     def detect_anomalies(
         self,
         symbol: str,
-        historical_prices: List[float],
+        historical_prices: Union[List[float], PriceSeries],
         volumes: List[float] = None
     ) -> AnomalyDetection:
         """
@@ -85,13 +265,15 @@ class MLService:
         
         Args:
             symbol: Stock symbol
-            historical_prices: Historical price data
+            historical_prices: Historical prices (list or PriceSeries)
             volumes: Trading volumes (optional)
             
         Returns:
             AnomalyDetection result
         """
-        if len(historical_prices) < 30:
+        series = _as_series(historical_prices)
+        
+        if len(series) < 30:
             return AnomalyDetection(
                 symbol=symbol,
                 is_anomaly=False,
@@ -100,24 +282,14 @@ class MLService:
                 detected_at=datetime.now()
             )
         
-        prices = np.array(historical_prices)
-        returns = np.diff(prices) / prices[:-1]
-        
-        # Calculate features
-        recent_return = returns[-1]
-        avg_return = np.mean(returns[:-1])
-        std_return = np.std(returns[:-1])
-        
-        # Z-score based anomaly detection
-        if std_return > 0:
-            z_score = abs((recent_return - avg_return) / std_return)
-        else:
-            z_score = 0
+        # Z-score of the latest return vs. history, in one fused pass
+        z, recent_return = fastmath.zscore_last(series.prices)
+        z_score = abs(z)
         
         is_anomaly = z_score > 3.0  # 3 standard deviations
         
         if is_anomaly:
-            direction = "spike" if recent_return > avg_return else "drop"
+            direction = "spike" if z > 0 else "drop"
             reasoning = f"Unusual {direction} detected: {abs(recent_return * 100):.2f}% move (z-score: {z_score:.2f})"
         else:
             reasoning = "No significant anomalies detected in recent price action"
@@ -147,14 +319,23 @@ class MLService:
         """
         recommendations = []
         
-        # Calculate portfolio metrics
-        total_value = sum(p.market_value for p in positions)
+        # Screen all positions at once; only flagged rows are formatted.
+        # Only the two columns the screens read are materialized.
+        n = len(positions)
+        market_value = np.fromiter((p.market_value for p in positions), dtype=np.float64, count=n)
+        gain_loss_percent = np.fromiter((p.gain_loss_percent for p in positions), dtype=np.float64, count=n)
+        weights = market_value / market_value.sum()
+        
+        overconcentrated = weights > 0.20  # More than 20% in single position
+        underperforming = gain_loss_percent < -10
+        strong = (gain_loss_percent > 50) & (weights > 0.15)
         
-        for position in positions:
-            weight = position.market_value / total_value
+        for i in np.flatnonzero(overconcentrated | underperforming | strong):
+            position = positions[i]
+            weight = float(weights[i])
             
             # Check for overconcentration
-            if weight > 0.20:  # More than 20% in single position
+            if overconcentrated[i]:
                 recommendations.append(PortfolioRecommendation(
                     action="rebalance",
                     symbol=position.symbol,
@@ -164,7 +345,7 @@ class MLService:
                 ))
             
             # Check for underperformers
-            if position.gain_loss_percent < -10:
+            if underperforming[i]:
                 recommendations.append(PortfolioRecommendation(
                     action="review",
                     symbol=position.symbol,
@@ -174,7 +355,7 @@ class MLService:
                 ))
             
             # Check for strong performers (take profits?)
-            if position.gain_loss_percent > 50 and weight > 0.15:
+            if strong[i]:
                 recommendations.append(PortfolioRecommendation(
                     action="consider_sell",
                     symbol=position.symbol,
@@ -214,13 +395,12 @@ class MLService:
         if len(returns) < 30:
             return 20.0  # Default 20% volatility
         
-        returns_array = np.array(returns)
+        returns_array = np.asarray(returns, dtype=INPUT_DTYPE)
         
-        # Simple volatility prediction: exponentially weighted moving average
-        weights = np.exp(np.linspace(-1, 0, len(returns_array)))
-        weights = weights / weights.sum()
-        
-        weighted_variance = np.average(returns_array ** 2, weights=weights)
+        # Simple volatility prediction: exponentially weighted moving average,
+        # weights decaying by e over the whole window
+        decay = np.exp(-1.0 / (len(returns_array) - 1))
+        weighted_variance = fastmath.ewma_var(returns_array, decay)
         volatility = np.sqrt(weighted_variance * 252) * 100  # Annualized
         
         return float(volatility)
@@ -228,7 +408,7 @@ class MLService:
     def calculate_risk_score(
         self,
         position: Position,
-        historical_prices: List[float]
+        historical_prices: Union[List[float], PriceSeries]
     ) -> Tuple[float, str]:
         """
         Calculate risk score for a position
@@ -238,19 +418,19 @@ class MLService:
             risk_score: 0-100 (higher = more risky)
             risk_level: "low", "medium", "high"
         """
-        if len(historical_prices) < 30:
+        return self._series_risk_score(_as_series(historical_prices))
+    
+    def _series_risk_score(self, series: PriceSeries) -> Tuple[float, str]:
+        """Risk score and level from price history alone"""
+        if len(series) < 30:
             return 50.0, "medium"
         
-        prices = np.array(historical_prices)
-        returns = np.diff(prices) / prices[:-1]
-        
         # Calculate volatility
-        volatility = np.std(returns) * np.sqrt(252) * 100
+        _, std = series.window_mean_std(len(series.returns))
+        volatility = std * np.sqrt(252) * 100
         
-        # Calculate max drawdown
-        peak = np.maximum.accumulate(prices)
-        drawdown = (prices - peak) / peak
-        max_dd = abs(np.min(drawdown)) * 100
+        # Calculate max drawdown (single pass, no temporaries)
+        max_dd = fastmath.max_drawdown(series.prices) * 100
         
         # Risk score combines volatility and drawdown
         risk_score = (volatility * 0.6 + max_dd * 0.4)
@@ -265,23 +445,22 @@ class MLService:
         
         return float(risk_score), risk_level
     
-    def _create_price_features(self, prices: np.ndarray) -> np.ndarray:
+    def _create_price_features(self, series: PriceSeries) -> np.ndarray:
         """Create features from price data"""
         # Moving averages
-        ma_5 = np.convolve(prices, np.ones(5)/5, mode='valid')
-        ma_20 = np.convolve(prices, np.ones(20)/20, mode='valid')
-        
-        # Returns
-        returns = np.diff(prices) / prices[:-1]
+        ma_5 = _rolling_mean(series.prices, 5)
+        ma_20 = _rolling_mean(series.prices, 20)
         
         # Volatility
-        volatility = np.array([np.std(returns[max(0, i-20):i]) for i in range(1, len(returns)+1)])
+        volatility = _rolling_std(series.cs_r, series.cs_r2, 20)
         
-        return np.column_stack([ma_5[-len(volatility):], ma_20[-len(volatility):], volatility])
+        # Align on the shortest series (the 20-day average)
+        n = len(ma_20)
+        return np.column_stack([ma_5[-n:], ma_20, volatility[-n:]])
     
     def identify_patterns(
         self,
-        historical_prices: List[float]
+        historical_prices: Union[List[float], PriceSeries]
     ) -> Dict[str, bool]:
         """
         Identify common chart patterns
@@ -289,37 +468,76 @@ class MLService:
         Returns:
             Dict of pattern names and whether they're detected
         """
-        if len(historical_prices) < 50:
+        if not isinstance(historical_prices, PriceSeries):
+            # No signal reads further back than the last 100 returns, so only
+            # that tail is converted (a PriceSeries answers windows in O(1))
+            historical_prices = historical_prices[-PATTERN_LOOKBACK:]
+        series = _as_series(historical_prices)
+        if len(series) < 50:
             return {}
         
-        prices = np.array(historical_prices)
+        prices = series.prices
         
         patterns = {}
         
         # Simple pattern detection (in production, use more sophisticated methods)
         
         # Uptrend: 20-day MA above 50-day MA
-        ma_20 = np.convolve(prices, np.ones(20)/20, mode='valid')
-        ma_50 = np.convolve(prices, np.ones(50)/50, mode='valid')
-        patterns['uptrend'] = bool(ma_20[-1] > ma_50[-1])
+        ma_20 = _trailing_mean(prices, 20)
+        ma_50 = _trailing_mean(prices, 50)
+        patterns['uptrend'] = ma_20 > ma_50
         
         # Downtrend
-        patterns['downtrend'] = bool(ma_20[-1] < ma_50[-1])
+        patterns['downtrend'] = ma_20 < ma_50
         
         # High volatility
-        returns = np.diff(prices) / prices[:-1]
-        recent_vol = np.std(returns[-20:])
-        long_term_vol = np.std(returns[-100:])
+        _, recent_vol = series.window_mean_std(20)
+        _, long_term_vol = series.window_mean_std(100)
         patterns['high_volatility'] = bool(recent_vol > long_term_vol * 1.5)
         
-        # Oversold (RSI-like)
-        gains = returns[returns > 0]
-        losses = abs(returns[returns < 0])
-        avg_gain = np.mean(gains[-14:]) if len(gains) > 0 else 0
-        avg_loss = np.mean(losses[-14:]) if len(losses) > 0 else 0
-        rs = avg_gain / avg_loss if avg_loss > 0 else 100
+        # Oversold (RSI over the last 14 returns)
+        window = series.returns[-14:]
+        gain = float(np.maximum(window, 0).sum())
+        loss = float(-np.minimum(window, 0).sum())
+        rs = gain / loss if loss > 0 else 100
         rsi = 100 - (100 / (1 + rs))
         patterns['oversold'] = bool(rsi < 30)
         patterns['overbought'] = bool(rsi > 70)
         
-        return patterns
\ No newline at end of file
+        return patterns
+    
+    def score_symbols(
+        self,
+        symbols_prices: Dict[str, Union[List[float], PriceSeries]],
+        max_workers: Optional[int] = None
+    ) -> Dict[str, Dict]:
+        """
+        Anomaly, risk score and patterns for many symbols at once
+        
+        Symbols are independent, so they are scored on a thread pool; the
+        heavy parts (NumPy reductions and numba kernels) release the GIL.
+        
+        Args:
+            symbols_prices: Historical prices per symbol
+            max_workers: Thread count (defaults to one per core)
+            
+        Returns:
+            Dict of symbol -> {"anomaly", "risk_score", "risk_level", "patterns"}
+        """
+        def score(item: Tuple[str, Union[List[float], PriceSeries]]) -> Tuple[str, Dict]:
+            symbol, prices = item
+            series = _as_series(prices)
+            risk_score, risk_level = self._series_risk_score(series)
+            return symbol, {
+                "anomaly": self.detect_anomalies(symbol, series),
+                "risk_score": risk_score,
+                "risk_level": risk_level,
+                "patterns": self.identify_patterns(series),
+            }
+        
+        if not symbols_prices:
+            return {}
+        
+        workers = min(max_workers or os.cpu_count() or 1, len(symbols_prices))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            return dict(pool.map(score, symbols_prices.items()))
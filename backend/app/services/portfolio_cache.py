@@ -0,0 +1,158 @@
+import logging
+import msgpack
+import redis.asyncio as redis
+from typing import Dict, List
+from app.schemas.portfolio import Position
+from app.services.shared_market_cache import shared_market_cache
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "portfolio"
+# Attempts at an optimistic (WATCH) update before giving up on caching
+MAX_UPDATE_ATTEMPTS = 3
+# Cached state expires after a day, so floating-point drift from merged
+# deltas is bounded by a full regeneration at least daily
+AGGREGATE_TTL_SECONDS = 86400
+
+# Aggregates stored per portfolio. All are sums of per-position
+# contributions, so a changed position is merged in as a delta.
+LINEAR_AGGREGATES = ("totals", "sector", "asset")
+
+
+def _positions_key(portfolio_id: str) -> str:
+    return f"{KEY_PREFIX}:{portfolio_id}:positions"
+
+
+def _aggregate_key(portfolio_id: str, name: str) -> str:
+    return f"{KEY_PREFIX}:{portfolio_id}:agg:{name}"
+
+
+def _contribution(position: Position) -> Dict:
+    """What one position adds to the linear aggregates"""
+    return {
+        "market_value": position.market_value,
+        "cost": position.cost_basis * position.quantity,
+        "gain_loss": position.gain_loss,
+        "sector": position.sector,
+        "asset_type": position.asset_type,
+    }
+
+
+def _apply(aggregates: Dict[str, Dict], contribution: Dict, sign: float):
+    """Add (sign=1) or remove (sign=-1) one position's contribution in place"""
+    totals = aggregates["totals"]
+    for field in ("market_value", "cost", "gain_loss"):
+        totals[field] = totals.get(field, 0.0) + sign * contribution[field]
+    totals["count"] = totals.get("count", 0) + int(sign)
+
+    for name, group in (("sector", contribution["sector"]), ("asset", contribution["asset_type"])):
+        values = aggregates[name]
+        values[group] = values.get(group, 0.0) + sign * contribution["market_value"]
+        if abs(values[group]) < 1e-9:
+            del values[group]
+
+
+def _contributions(positions: List[Position]) -> Dict[str, Dict]:
+    """
+    Per-lot contributions keyed by symbol and lot number, so several lots
+    of the same symbol are kept apart
+    """
+    lots: Dict[str, int] = {}
+    contributions = {}
+    for p in positions:
+        lot = lots.get(p.symbol, 0)
+        lots[p.symbol] = lot + 1
+        contributions[f"{p.symbol}:{lot}"] = _contribution(p)
+    return contributions
+
+
+def _regenerate(contributions: Dict[str, Dict]) -> Dict[str, Dict]:
+    """Linear aggregates computed from scratch"""
+    aggregates = {name: {} for name in LINEAR_AGGREGATES}
+    for contribution in contributions.values():
+        _apply(aggregates, contribution, 1.0)
+    return aggregates
+
+
+class PortfolioAggregateCache:
+    """
+    Redis cache of portfolio-level aggregates (totals, sector and asset
+    type market values), kept current by merging deltas
+
+    Each portfolio stores its per-lot contributions next to the
+    aggregates. On a refresh, only changed lots are applied: the old
+    contribution is subtracted and the new one added, instead of
+    recomputing every aggregate. When nothing is cached yet (or the cached
+    state has expired) the aggregates are regenerated in full.
+
+    Updates are optimistic (WATCH/MULTI), so concurrent refreshes of the
+    same portfolio never merge a delta into a stale base. Redis errors are
+    logged and the aggregates are computed without caching.
+    """
+
+    async def refresh(self, portfolio_id: str, positions: List[Position]) -> Dict[str, Dict]:
+        """
+        Bring a portfolio's aggregates up to date with its current positions
+
+        Returns:
+            Dict with "totals" (market_value, cost, gain_loss, count),
+            "sector" and "asset" (market value per group)
+        """
+        contributions = _contributions(positions)
+
+        try:
+            for _ in range(MAX_UPDATE_ATTEMPTS):
+                try:
+                    return await self._merge(portfolio_id, contributions)
+                except redis.WatchError:
+                    continue
+            logger.warning("Portfolio %s aggregates changed concurrently; not cached", portfolio_id)
+        except redis.RedisError as e:
+            logger.warning("Portfolio aggregate cache update failed: %s", e)
+
+        return _regenerate(contributions)
+
+    async def _merge(self, portfolio_id: str, contributions: Dict[str, Dict]) -> Dict[str, Dict]:
+        positions_key = _positions_key(portfolio_id)
+        aggregate_keys = [_aggregate_key(portfolio_id, name) for name in LINEAR_AGGREGATES]
+
+        async with shared_market_cache.redis.pipeline(transaction=True) as pipe:
+            await pipe.watch(positions_key, *aggregate_keys)
+            raw_values = await pipe.mget([positions_key, *aggregate_keys])
+
+            if any(raw is None for raw in raw_values):
+                # Nothing (or only part) cached: regenerate
+                aggregates = _regenerate(contributions)
+                changed = True
+            else:
+                cached_contributions = msgpack.unpackb(raw_values[0])
+                aggregates = {
+                    name: msgpack.unpackb(raw)
+                    for name, raw in zip(LINEAR_AGGREGATES, raw_values[1:])
+                }
+                changed = False
+                for lot in cached_contributions.keys() | contributions.keys():
+                    old = cached_contributions.get(lot)
+                    new = contributions.get(lot)
+                    if old == new:
+                        continue
+                    changed = True
+                    if old is not None:
+                        _apply(aggregates, old, -1.0)
+                    if new is not None:
+                        _apply(aggregates, new, 1.0)
+
+            if not changed:
+                await pipe.unwatch()
+                return aggregates
+
+            pipe.multi()
+            pipe.set(positions_key, msgpack.packb(contributions), ex=AGGREGATE_TTL_SECONDS)
+            for key, name in zip(aggregate_keys, LINEAR_AGGREGATES):
+                pipe.set(key, msgpack.packb(aggregates[name]), ex=AGGREGATE_TTL_SECONDS)
+            await pipe.execute()
+
+        return aggregates
+
+
+portfolio_aggregate_cache = PortfolioAggregateCache()
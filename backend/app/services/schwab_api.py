@@ -1,8 +1,241 @@
-import httpx
-from typing import List, Dict, Optional
-from datetime import datetime
+import asyncio
+import functools
+import logging
+import random
+import time
+import zlib
+import numpy as np
+import orjson
+from urllib.parse import urlencode
+from typing import List, Dict, Optional, Tuple, AsyncIterator, Awaitable, Callable
+from datetime import date, datetime
 from app.core.config import settings
-from app.schemas.portfolio import Position, Transaction, PortfolioSnapshot
+from app.schemas.portfolio import Position, Transaction, PortfolioSnapshot, AssetType
+import httpx
+import ijson
+import redis.asyncio as redis
+from app.services import http
+from app.services.cache import cached
+from app.services.shared_market_cache import shared_market_cache, quote_key, history_key
+
+logger = logging.getLogger(__name__)
+
+# Caps in-flight Schwab requests across all clients, so wide fan-outs stay
+# under the API rate limit instead of drawing 429s
+_request_slots = asyncio.Semaphore(settings.SCHWAB_MAX_CONCURRENCY)
+
+# Endpoint paths, relative to the shared client's base URL
+_ACCOUNT_PATH = "/trader/v1/accounts/{account_id}"
+_POSITIONS_PATH = "/trader/v1/accounts/{account_id}/positions"
+_TRANSACTIONS_PATH = "/trader/v1/accounts/{account_id}/transactions"
+_QUOTES_PATH = "/marketdata/v1/quotes"
+_PRICE_HISTORY_PATH = "/marketdata/v1/pricehistory"
+
+# Rate-limited and transient server errors are retried with backoff
+RETRY_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+MAX_ATTEMPTS = 3
+RETRY_BASE_DELAY_SECONDS = 0.5
+RETRY_MAX_DELAY_SECONDS = 10.0
+
+# Schwab asset types mapped to ours (anything else is treated as a stock)
+_ASSET_TYPE_MAP = {
+    "EQUITY": AssetType.STOCK,
+    "ETF": AssetType.ETF,
+    "BOND": AssetType.BOND,
+    "MUTUAL_FUND": AssetType.ETF,
+    "OPTION": AssetType.STOCK,
+    "CASH_EQUIVALENT": AssetType.CASH,
+}
+
+# Provider name in shared market cache keys
+SCHWAB_PROVIDER = "schwab"
+# Price history for a given request is fixed within a trading day unless
+# the candles are intraday
+PRICE_HISTORY_TTL_SECONDS = 24 * 3600
+INTRADAY_PRICE_HISTORY_TTL_SECONDS = 60
+
+# Quote freshness in seconds, chosen per symbol from how much it is moving:
+# (minimum absolute % change on the day, TTL), checked in order
+QUOTE_TTL_BY_MOVE = ((3.0, 2), (1.0, 5), (0.0, 15))
+CASH_QUOTE_TTL_SECONDS = 60
+# Upper bound on how long Redis keeps a quote entry at all
+QUOTE_MAX_TTL_SECONDS = 60
+
+
+def _price_history_key(
+    self,
+    symbol: str,
+    period_type: str = "year",
+    period: int = 1,
+    frequency_type: str = "daily"
+) -> str:
+    """Cache key for SchwabAPIClient.get_price_history (same arguments)"""
+    return history_key(SCHWAB_PROVIDER, symbol, f"{period_type}:{period}", frequency_type)
+
+
+def _price_history_ttl(
+    self,
+    symbol: str,
+    period_type: str = "year",
+    period: int = 1,
+    frequency_type: str = "daily"
+) -> int:
+    """Cache TTL for SchwabAPIClient.get_price_history (same arguments)"""
+    if frequency_type == "minute":
+        return INTRADAY_PRICE_HISTORY_TTL_SECONDS
+    return PRICE_HISTORY_TTL_SECONDS
+
+
+def _retry_delay(response: httpx.Response, attempt: int) -> float:
+    """Seconds to wait before retrying: Retry-After if given, else exponential backoff with jitter"""
+    retry_after = response.headers.get("Retry-After")
+    if retry_after is not None and retry_after.isdigit():
+        return min(float(retry_after), RETRY_MAX_DELAY_SECONDS)
+    delay = RETRY_BASE_DELAY_SECONDS * 2 ** attempt
+    return min(delay + random.uniform(0, delay), RETRY_MAX_DELAY_SECONDS)
+
+
+def _quote_ttl(quote: Dict) -> int:
+    """Seconds a quote stays fresh: short for big movers, long for cash equivalents"""
+    if quote.get("assetMainType") == "CASH_EQUIVALENT":
+        return CASH_QUOTE_TTL_SECONDS
+    move = abs(quote.get("quote", {}).get("netPercentChange") or 0.0)
+    for threshold, ttl in QUOTE_TTL_BY_MOVE:
+        if move >= threshold:
+            return ttl
+    return QUOTE_TTL_BY_MOVE[-1][1]
+
+
+class _ChunkReader:
+    """File-like async reader over an async byte iterator, as ijson expects"""
+    
+    def __init__(self, chunks: AsyncIterator[bytes]):
+        self._chunks = chunks.__aiter__()
+    
+    async def read(self, size: int = -1) -> bytes:
+        # ijson probes the stream type with a zero-length read first
+        if size == 0:
+            return b""
+        async for chunk in self._chunks:
+            if chunk:
+                return chunk
+        return b""
+
+
+async def _parse_streamed_json(chunks: AsyncIterator[bytes]) -> Dict:
+    """
+    Decode a JSON object while its body is still arriving
+    
+    Top-level values are built as they complete, so the raw body is never
+    held in full alongside the decoded objects.
+    """
+    return {key: value async for key, value in ijson.kvitems_async(_ChunkReader(chunks), "", use_float=True)}
+
+
+def _build_positions(items: List[Dict]) -> List[Position]:
+    """
+    Transform Schwab position entries to Position models
+    
+    Numeric fields are pulled into float columns and derived in one
+    vectorized pass. The rows are then already the right types, so models
+    are built with model_construct, skipping per-field validation of this
+    trusted, Schwab-origin data.
+    """
+    instruments = [item.get("instrument", {}) for item in items]
+    
+    def column(field: str) -> np.ndarray:
+        return np.array([item.get(field, 0) for item in items], dtype=np.float64)
+    
+    quantity = column("longQuantity")
+    market_value = column("marketValue")
+    current_price = np.divide(
+        market_value, quantity, out=np.zeros_like(market_value), where=quantity > 0
+    )
+    
+    return [
+        Position.model_construct(
+            symbol=instrument.get("symbol", ""),
+            name=instrument.get("description", ""),
+            quantity=q,
+            cost_basis=cb,
+            current_price=cp,
+            market_value=mv,
+            gain_loss=gl,
+            gain_loss_percent=glp,
+            sector="Unknown",  # May need separate API call
+            # Stored as the plain value, as use_enum_values would
+            asset_type=_ASSET_TYPE_MAP.get(instrument.get("assetType"), AssetType.STOCK).value
+        )
+        for instrument, q, cb, cp, mv, gl, glp in zip(
+            instruments, quantity.tolist(), column("averagePrice").tolist(),
+            current_price.tolist(), market_value.tolist(),
+            column("currentDayProfitLoss").tolist(),
+            column("currentDayProfitLossPercentage").tolist()
+        )
+    ]
+
+
+TOKEN_KEY_PREFIX = "schwab:token"
+# Tokens leave the shared cache this long before Schwab expires them
+TOKEN_EXPIRY_MARGIN_SECONDS = 60
+# How long a worker trusts its local copy before re-reading Redis
+LOCAL_TOKEN_TTL_SECONDS = 5
+
+
+class TokenCache:
+    """
+    Access tokens per user, in Redis (shared by all workers) with a short
+    local copy in front
+
+    A refresh writes the new token to both, so no worker keeps sending a
+    token that was replaced; other workers pick it up within
+    LOCAL_TOKEN_TTL_SECONDS or immediately after a 401 (see bust).
+    """
+
+    def __init__(self):
+        self._local: Dict[str, Tuple[str, float]] = {}
+
+    @staticmethod
+    def _key(user_id: str) -> str:
+        return f"{TOKEN_KEY_PREFIX}:{user_id}"
+
+    async def get(self, user_id: str) -> Optional[str]:
+        """Current access token for a user, or None if there is none"""
+        local = self._local.get(user_id)
+        if local is not None and time.monotonic() - local[1] < LOCAL_TOKEN_TTL_SECONDS:
+            return local[0]
+
+        try:
+            raw = await shared_market_cache.redis.get(self._key(user_id))
+        except redis.RedisError as e:
+            logger.warning("Token cache read failed: %s", e)
+            return local[0] if local is not None else None
+
+        if raw is None:
+            self._local.pop(user_id, None)
+            return None
+        token = raw.decode()
+        self._local[user_id] = (token, time.monotonic())
+        return token
+
+    async def store(self, user_id: str, tokens: Dict):
+        """Replace a user's token with a fresh token response (local and shared)"""
+        self._local.pop(user_id, None)
+        token = tokens["access_token"]
+        ttl = max(int(tokens.get("expires_in", 1800)) - TOKEN_EXPIRY_MARGIN_SECONDS, 1)
+        try:
+            await shared_market_cache.redis.set(self._key(user_id), token, ex=ttl)
+        except redis.RedisError as e:
+            logger.warning("Token cache write failed: %s", e)
+        self._local[user_id] = (token, time.monotonic())
+
+    def bust(self, user_id: str):
+        """Drop the local copy so the next get re-reads the shared cache"""
+        self._local.pop(user_id, None)
+
+
+token_cache = TokenCache()
+
 
 class SchwabAPIClient:
     """
@@ -10,15 +243,79 @@ class SchwabAPIClient:
     
     This is a template/placeholder for when Schwab API access is granted.
     Update with actual API endpoints and authentication flow.
+    
+    With a user_id, the access token is read from the token cache for
+    every request, so a refresh elsewhere takes effect immediately;
+    otherwise the token passed in is used as is.
     """
     
-    def __init__(self, access_token: Optional[str] = None):
-        self.base_url = settings.SCHWAB_BASE_URL
+    def __init__(self, access_token: Optional[str] = None, user_id: Optional[str] = None):
+        self.user_id = user_id
         self.access_token = access_token
-        self.headers = {
-            "Authorization": f"Bearer {access_token}" if access_token else "",
-            "Content-Type": "application/json"
-        }
+    
+    @property
+    def access_token(self) -> Optional[str]:
+        return self._token
+    
+    @access_token.setter
+    def access_token(self, token: Optional[str]):
+        # Built once per token rather than per request. Only GETs are sent,
+        # so there is no body and no Content-Type to declare.
+        self._token = token
+        self._auth = {"Authorization": f"Bearer {token}"} if token else {}
+    
+    async def _auth_headers(self) -> Dict[str, str]:
+        """Request headers carrying the user's current access token"""
+        if self.user_id is not None:
+            token = await token_cache.get(self.user_id)
+            if token is not None and token != self._token:
+                self.access_token = token
+        return self._auth
+    
+    async def _get(
+        self,
+        path: str,
+        params: Optional[Dict] = None,
+        parse: Optional[Callable[[AsyncIterator[bytes]], Awaitable[Dict]]] = None
+    ) -> Dict:
+        """
+        GET a Schwab endpoint within the concurrency cap and decode the JSON body
+        
+        With a parse function the body is streamed into it rather than
+        buffered first. 429 and 5xx responses are retried up to
+        MAX_ATTEMPTS in total; the wait happens outside the concurrency cap
+        so other requests proceed.
+        """
+        for attempt in range(MAX_ATTEMPTS):
+            async with _request_slots:
+                response = await self._send(path, params, stream=parse is not None)
+                try:
+                    if response.status_code not in RETRY_STATUS_CODES or attempt == MAX_ATTEMPTS - 1:
+                        response.raise_for_status()
+                        if parse is None:
+                            return orjson.loads(response.content)
+                        return await parse(response.aiter_bytes())
+                finally:
+                    await response.aclose()
+            
+            delay = _retry_delay(response, attempt)
+            logger.info("Schwab %s returned %d, retrying in %.1fs", path, response.status_code, delay)
+            await asyncio.sleep(delay)
+    
+    async def _send(self, path: str, params: Optional[Dict], stream: bool = False) -> httpx.Response:
+        """One GET, re-reading the token once on a 401"""
+        request = http.client.build_request("GET", path, headers=await self._auth_headers(), params=params)
+        response = await http.client.send(request, stream=stream)
+        if response.status_code == 401 and self.user_id is not None:
+            # The token may have been refreshed by another worker
+            stale_token = self.access_token
+            token_cache.bust(self.user_id)
+            headers = await self._auth_headers()
+            if self.access_token != stale_token:
+                await response.aclose()
+                request = http.client.build_request("GET", path, headers=headers, params=params)
+                response = await http.client.send(request, stream=stream)
+        return response
     
     async def get_account_info(self, account_id: str) -> Dict:
         """
@@ -27,13 +324,7 @@ class SchwabAPIClient:
         Endpoint: GET /trader/v1/accounts/{accountId}
         """
         # TODO: Implement when API is available
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{self.base_url}/trader/v1/accounts/{account_id}",
-                headers=self.headers
-            )
-            response.raise_for_status()
-            return response.json()
+        return await self._get(_ACCOUNT_PATH.format(account_id=account_id))
     
     async def get_positions(self, account_id: str) -> List[Position]:
         """
@@ -44,33 +335,12 @@ class SchwabAPIClient:
         # TODO: Implement when API is available
         # This is a placeholder showing expected structure
         
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{self.base_url}/trader/v1/accounts/{account_id}/positions",
-                headers=self.headers
-            )
-            response.raise_for_status()
-            data = response.json()
-            
-            # Transform Schwab API response to Position schema
-            positions = []
-            for item in data.get("securitiesAccount", {}).get("positions", []):
-                instrument = item.get("instrument", {})
-                position = Position(
-                    symbol=instrument.get("symbol", ""),
-                    name=instrument.get("description", ""),
-                    quantity=item.get("longQuantity", 0),
-                    cost_basis=item.get("averagePrice", 0),
-                    current_price=item.get("marketValue", 0) / item.get("longQuantity", 1),
-                    market_value=item.get("marketValue", 0),
-                    gain_loss=item.get("currentDayProfitLoss", 0),
-                    gain_loss_percent=item.get("currentDayProfitLossPercentage", 0),
-                    sector="Unknown",  # May need separate API call
-                    asset_type=self._map_asset_type(instrument.get("assetType", ""))
-                )
-                positions.append(position)
-            
-            return positions
+        data = await self._get(_POSITIONS_PATH.format(account_id=account_id))
+        
+        # Validation and model construction are CPU work; keep them off the event loop
+        return await asyncio.to_thread(
+            _build_positions, data.get("securitiesAccount", {}).get("positions", [])
+        )
     
     async def get_transactions(
         self,
@@ -90,21 +360,14 @@ class SchwabAPIClient:
         if end_date:
             params["endDate"] = end_date.isoformat()
         
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{self.base_url}/trader/v1/accounts/{account_id}/transactions",
-                headers=self.headers,
-                params=params
-            )
-            response.raise_for_status()
-            data = response.json()
-            
-            # Transform to Transaction schema
-            transactions = []
-            # Parse Schwab transaction format
-            # TODO: Complete mapping when API docs are available
-            
-            return transactions
+        data = await self._get(_TRANSACTIONS_PATH.format(account_id=account_id), params=params)
+        
+        # Transform to Transaction schema
+        transactions = []
+        # Parse Schwab transaction format
+        # TODO: Complete mapping when API docs are available
+        
+        return transactions
     
     async def get_market_quote(self, symbol: str) -> Dict:
         """
@@ -113,15 +376,51 @@ class SchwabAPIClient:
         Endpoint: GET /marketdata/v1/quotes
         """
         # TODO: Implement when API is available
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{self.base_url}/marketdata/v1/quotes",
-                headers=self.headers,
-                params={"symbols": symbol}
+        return await self.get_quotes([symbol])
+    
+    async def get_quotes(self, symbols: List[str]) -> Dict[str, Dict]:
+        """
+        Get quotes for many symbols in one request
+        
+        Cached quotes are read in one MGET. Each entry records when it was
+        fetched and its own TTL (see _quote_ttl); stale or missing symbols
+        are refetched inline in a single request, since the quotes endpoint
+        takes a comma-separated symbol list. Nothing is refreshed in the
+        background, so only symbols that are being asked for cost API calls.
+        
+        Endpoint: GET /marketdata/v1/quotes
+        
+        Returns:
+            Dict of symbol -> quote; symbols Schwab does not know are absent
+        """
+        if not symbols:
+            return {}
+        
+        keys = [quote_key(SCHWAB_PROVIDER, s) for s in symbols]
+        entries = await shared_market_cache.get_many(keys, "quote")
+        now = time.time()
+        quotes = {
+            s: entry["value"]
+            for s, entry in zip(symbols, entries)
+            if entry is not None and now - entry["fetched_at"] <= entry["ttl_s"]
+        }
+        
+        missing = [s for s in symbols if s not in quotes]
+        if missing:
+            fetched = await self._get(_QUOTES_PATH, params={"symbols": ",".join(missing)})
+            await shared_market_cache.set_many(
+                {
+                    quote_key(SCHWAB_PROVIDER, s): {"value": q, "ttl_s": _quote_ttl(q), "fetched_at": now}
+                    for s, q in fetched.items()
+                },
+                "quote",
+                ttl=QUOTE_MAX_TTL_SECONDS
             )
-            response.raise_for_status()
-            return response.json()
+            quotes.update(fetched)
+        
+        return quotes
     
+    @cached("history", key=_price_history_key, ttl=_price_history_ttl)
     async def get_price_history(
         self,
         symbol: str,
@@ -132,6 +431,9 @@ class SchwabAPIClient:
         """
         Get historical price data
         
+        Cached per (symbol, period type, period, frequency): for a day, or
+        a minute for intraday candles.
+        
         Endpoint: GET /marketdata/v1/pricehistory
         """
         # TODO: Implement when API is available
@@ -142,26 +444,38 @@ class SchwabAPIClient:
             "frequencyType": frequency_type
         }
         
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{self.base_url}/marketdata/v1/pricehistory",
-                headers=self.headers,
-                params=params
-            )
-            response.raise_for_status()
-            return response.json()
-    
-    def _map_asset_type(self, schwab_type: str) -> str:
-        """Map Schwab asset type to our AssetType enum"""
-        mapping = {
-            "EQUITY": "stock",
-            "ETF": "etf",
-            "BOND": "bond",
-            "MUTUAL_FUND": "etf",
-            "OPTION": "stock",
-            "CASH_EQUIVALENT": "cash"
-        }
-        return mapping.get(schwab_type, "stock")
+        # Candle arrays run to megabytes; decode them as they arrive
+        return await self._get(_PRICE_HISTORY_PATH, params=params, parse=_parse_streamed_json)
+    
+    async def get_price_histories(
+        self,
+        symbols: List[str],
+        period_type: str = "year",
+        period: int = 1,
+        frequency_type: str = "daily"
+    ) -> Dict[str, Dict]:
+        """
+        Get historical price data for many symbols concurrently
+        
+        There is no batch endpoint for price history, so one request per
+        symbol is issued at once. A failing symbol is logged and left out
+        rather than failing the whole batch.
+        
+        Returns:
+            Dict of symbol -> price history for the symbols that succeeded
+        """
+        results = await asyncio.gather(
+            *(self.get_price_history(s, period_type, period, frequency_type) for s in symbols),
+            return_exceptions=True
+        )
+        
+        histories = {}
+        for symbol, result in zip(symbols, results):
+            if isinstance(result, Exception):
+                logger.warning("Price history for %s failed: %s", symbol, result)
+            else:
+                histories[symbol] = result
+        return histories
 
 
 class OAuthHandler:
@@ -191,15 +505,16 @@ class OAuthHandler:
             "scope": "account_info trading market_data"  # Adjust scopes as needed
         }
         
-        query_string = "&".join([f"{k}={v}" for k, v in params.items()])
-        return f"{self.auth_url}?{query_string}"
+        # Percent-encodes values (the scope list contains spaces)
+        return f"{self.auth_url}?{urlencode(params)}"
     
-    async def exchange_code_for_token(self, authorization_code: str) -> Dict:
+    async def exchange_code_for_token(self, authorization_code: str, user_id: Optional[str] = None) -> Dict:
         """
         Exchange authorization code for access token
         
         Args:
             authorization_code: Code received from OAuth callback
+            user_id: If given, the new token is stored in the token cache
             
         Returns:
             Dict with access_token, refresh_token, expires_in
@@ -212,20 +527,23 @@ class OAuthHandler:
             "redirect_uri": self.redirect_uri
         }
         
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                self.token_url,
-                data=data
-            )
-            response.raise_for_status()
-            return response.json()
+        response = await http.client.post(
+            self.token_url,
+            data=data
+        )
+        response.raise_for_status()
+        tokens = orjson.loads(response.content)
+        if user_id is not None:
+            await token_cache.store(user_id, tokens)
+        return tokens
     
-    async def refresh_access_token(self, refresh_token: str) -> Dict:
+    async def refresh_access_token(self, refresh_token: str, user_id: Optional[str] = None) -> Dict:
         """
         Refresh expired access token
         
         Args:
             refresh_token: Refresh token from previous authentication
+            user_id: If given, the new token replaces the cached one
             
         Returns:
             Dict with new access_token and expires_in
@@ -237,27 +555,136 @@ class OAuthHandler:
             "client_secret": self.client_secret
         }
         
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                self.token_url,
-                data=data
-            )
-            response.raise_for_status()
-            return response.json()
+        response = await http.client.post(
+            self.token_url,
+            data=data
+        )
+        response.raise_for_status()
+        tokens = orjson.loads(response.content)
+        if user_id is not None:
+            await token_cache.store(user_id, tokens)
+        return tokens
 
 
 # Mock data service for development (until Schwab API is available)
+# Same stocks as the frontend mock data: (symbol, name, sector, asset type)
+_MOCK_STOCKS = [
+    ("AAPL", "Apple Inc.", "Technology", "stock"),
+    ("MSFT", "Microsoft Corporation", "Technology", "stock"),
+    ("GOOGL", "Alphabet Inc.", "Technology", "stock"),
+    ("AMZN", "Amazon.com Inc.", "Consumer Cyclical", "stock"),
+    ("NVDA", "NVIDIA Corporation", "Technology", "stock"),
+    ("JPM", "JPMorgan Chase & Co.", "Financial Services", "stock"),
+    ("V", "Visa Inc.", "Financial Services", "stock"),
+    ("JNJ", "Johnson & Johnson", "Healthcare", "stock"),
+    ("PG", "Procter & Gamble Co.", "Consumer Defensive", "stock"),
+    ("XOM", "Exxon Mobil Corporation", "Energy", "stock"),
+    ("SPY", "SPDR S&P 500 ETF", "Diversified", "etf"),
+    ("QQQ", "Invesco QQQ Trust", "Technology", "etf"),
+]
+_MOCK_SYMBOLS = [stock[0] for stock in _MOCK_STOCKS]
+_MOCK_DAYS = 365
+_MOCK_POSITION_COUNT = 10
+_MOCK_TRADED_COUNT = 8
+_MOCK_TRANSACTION_COUNT = 50
+# Mock payloads kept in memory; keyed by (account, day), so older days are
+# evicted instead of accumulating for the life of the worker
+_MOCK_PAYLOAD_CACHE_SIZE = 32
+
+# Daily prices for every mock symbol (rows = days, oldest first), generated
+# once as a geometric random walk from $100, $150, $200, ...
+_mock_rng = np.random.default_rng(42)
+_MOCK_PRICES = (100 + 50 * np.arange(len(_MOCK_STOCKS))) * np.exp(
+    np.cumsum(_mock_rng.normal(0, 0.01, size=(_MOCK_DAYS + 1, len(_MOCK_STOCKS))), axis=0)
+)
+
+
+@functools.lru_cache(maxsize=_MOCK_PAYLOAD_CACHE_SIZE)
+def _build_mock_payload(account_id: str, day: date) -> Tuple[Tuple[Position, ...], Tuple[Transaction, ...]]:
+    """Build mock positions and transactions for an account as of a day"""
+    rng = np.random.default_rng([day.toordinal(), zlib.crc32(account_id.encode())])
+    n = _MOCK_POSITION_COUNT
+    
+    # Positions: bought at the start of the price history
+    quantity = rng.integers(10, 60, size=n).astype(np.float64)
+    cost_basis = _MOCK_PRICES[0, :n]
+    current_price = _MOCK_PRICES[-1, :n]
+    market_value = current_price * quantity
+    gain_loss = (current_price - cost_basis) * quantity
+    gain_loss_percent = gain_loss / (cost_basis * quantity) * 100
+    
+    positions = tuple(
+        Position(
+            symbol=symbol,
+            name=name,
+            quantity=q,
+            cost_basis=cb,
+            current_price=cp,
+            market_value=mv,
+            gain_loss=gl,
+            gain_loss_percent=glp,
+            sector=sector,
+            asset_type=asset_type
+        )
+        for (symbol, name, sector, asset_type), q, cb, cp, mv, gl, glp in zip(
+            _MOCK_STOCKS[:n], quantity.tolist(), cost_basis.tolist(), current_price.tolist(),
+            market_value.tolist(), gain_loss.tolist(), gain_loss_percent.tolist()
+        )
+    )
+    
+    # Transactions: random days over the past year at that day's price, newest first
+    m = _MOCK_TRANSACTION_COUNT
+    days_ago = np.sort(rng.integers(0, _MOCK_DAYS, size=m))
+    stock_idx = rng.choice(_MOCK_TRADED_COUNT, size=m)
+    is_buy = rng.random(m) > 0.3  # 70% buy, 30% sell
+    txn_quantity = rng.integers(1, 21, size=m).astype(np.float64)
+    price = _MOCK_PRICES[_MOCK_DAYS - days_ago, stock_idx]
+    total = txn_quantity * price
+    dates = (np.datetime64(day, "D") - days_ago).astype("datetime64[s]").tolist()
+    
+    transactions = tuple(
+        Transaction(
+            id=f"txn-{i}",
+            date=d,
+            symbol=_MOCK_SYMBOLS[s],
+            type="buy" if buy else "sell",
+            quantity=q,
+            price=p,
+            total=t,
+            fees=t * 0.001  # 0.1% fees
+        )
+        for i, (d, s, buy, q, p, t) in enumerate(zip(
+            dates, stock_idx.tolist(), is_buy.tolist(), txn_quantity.tolist(),
+            price.tolist(), total.tolist()
+        ))
+    )
+    
+    return positions, transactions
+
+
 class MockDataService:
-    """Provides mock data for development and testing"""
+    """
+    Provides mock data for development and testing
+    
+    Prices are generated once at import; positions and transactions are
+    vectorized slices of them, memoized per (account, day).
+    """
     
     @staticmethod
-    async def get_mock_positions() -> List[Position]:
+    async def get_mock_positions(account_id: str = "mock") -> List[Position]:
         """Generate mock positions similar to frontend mock data"""
-        # Import your mock data generator from frontend
-        # Or replicate the logic here
-        return []
+        positions, _ = _build_mock_payload(account_id, date.today())
+        return list(positions)
+    
+    @staticmethod
+    async def get_mock_transactions(account_id: str = "mock") -> List[Transaction]:
+        """Generate mock transactions (newest first)"""
+        _, transactions = _build_mock_payload(account_id, date.today())
+        return list(transactions)
     
     @staticmethod
-    async def get_mock_transactions() -> List[Transaction]:
-        """Generate mock transactions"""
-        return []
\ No newline at end of file
+    async def get_mock_price_history(symbol: str) -> List[float]:
+        """Get a year of mock daily closing prices for a symbol"""
+        if symbol not in _MOCK_SYMBOLS:
+            return []
+        return _MOCK_PRICES[:, _MOCK_SYMBOLS.index(symbol)].tolist()
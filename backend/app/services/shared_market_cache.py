@@ -0,0 +1,155 @@
+import asyncio
+import logging
+import msgpack
+import redis.asyncio as redis
+from prometheus_client import Counter
+from typing import Any, Dict, List, Optional
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "shared:market"
+INVALIDATE_CHANNEL = "shared:market:invalidate"
+
+# TTLs in seconds per data type
+TTL_SECONDS = {
+    "quote": 10,
+    "orderbook": 5,
+    "history": 60,
+    "indices": 10,
+    "movers": 60,
+    "sectors": 60,
+    "fundamentals": 3600,
+}
+
+CACHE_HITS = Counter(
+    "market_cache_hits_total",
+    "Shared market data cache hits",
+    ["kind"]
+)
+CACHE_MISSES = Counter(
+    "market_cache_misses_total",
+    "Shared market data cache misses",
+    ["kind"]
+)
+
+
+def quote_key(provider: str, symbol: str) -> str:
+    return f"{KEY_PREFIX}:{provider}:{symbol}:quote"
+
+
+def history_key(provider: str, symbol: str, period: str, interval: str) -> str:
+    return f"{KEY_PREFIX}:{provider}:{symbol}:history:{period}:{interval}"
+
+
+def fundamentals_key(provider: str, symbol: str) -> str:
+    return f"{KEY_PREFIX}:{provider}:{symbol}:fundamentals"
+
+
+class SharedMarketCache:
+    """
+    Redis cache for market data shared by all users and workers
+
+    Values are msgpack-encoded and stored with a per-type TTL. Redis
+    errors are logged and treated as misses so the endpoints keep working
+    (uncached) when Redis is down.
+    """
+
+    def __init__(self, url: Optional[str] = None):
+        self.url = url or settings.REDIS_URL
+        self._redis: Optional[redis.Redis] = None
+        self._listener: Optional[asyncio.Task] = None
+
+    @property
+    def redis(self) -> redis.Redis:
+        if self._redis is None:
+            self._redis = redis.from_url(self.url)
+        return self._redis
+
+    async def get(self, key: str, kind: str) -> Optional[Any]:
+        """Get a cached value, or None on miss"""
+        return (await self.get_many([key], kind))[0]
+
+    async def get_many(self, keys: List[str], kind: str) -> List[Optional[Any]]:
+        """Get several cached values with a single MGET"""
+        if not keys:
+            return []
+
+        try:
+            raw_values = await self.redis.mget(keys)
+        except redis.RedisError as e:
+            logger.warning("Market cache read failed: %s", e)
+            raw_values = [None] * len(keys)
+
+        values = []
+        for raw in raw_values:
+            if raw is None:
+                CACHE_MISSES.labels(kind=kind).inc()
+                values.append(None)
+            else:
+                CACHE_HITS.labels(kind=kind).inc()
+                values.append(msgpack.unpackb(raw))
+        return values
+
+    async def set(self, key: str, value: Any, kind: str, ttl: Optional[int] = None):
+        """Cache a value with the TTL for its data type (or an explicit TTL)"""
+        await self.set_many({key: value}, kind, ttl=ttl)
+
+    async def set_many(self, items: Dict[str, Any], kind: str, ttl: Optional[int] = None):
+        """Cache several values in one pipelined round-trip"""
+        if not items:
+            return
+
+        ttl = ttl or TTL_SECONDS[kind]
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for key, value in items.items():
+                    pipe.setex(key, ttl, msgpack.packb(value))
+                await pipe.execute()
+        except redis.RedisError as e:
+            logger.warning("Market cache write failed: %s", e)
+
+    async def invalidate(self, symbol: str):
+        """
+        Evict every cached entry for a symbol (e.g. after a corporate action)
+
+        Published on the invalidation channel so all app instances evict.
+        """
+        await self.redis.publish(INVALIDATE_CHANNEL, symbol)
+
+    async def _evict(self, symbol: str):
+        keys = [key async for key in self.redis.scan_iter(match=f"{KEY_PREFIX}:*:{symbol}:*")]
+        if keys:
+            await self.redis.delete(*keys)
+
+    async def _listen(self):
+        """Subscribe to the invalidation channel and evict on each message"""
+        while True:
+            try:
+                async with self.redis.pubsub() as pubsub:
+                    await pubsub.subscribe(INVALIDATE_CHANNEL)
+                    async for message in pubsub.listen():
+                        if message["type"] != "message":
+                            continue
+                        symbol = message["data"].decode()
+                        await self._evict(symbol)
+            except redis.RedisError as e:
+                logger.warning("Market cache invalidation listener error: %s", e)
+                await asyncio.sleep(5)
+
+    def start(self):
+        """Start the invalidation listener (call from app startup)"""
+        if self._listener is None:
+            self._listener = asyncio.create_task(self._listen())
+
+    async def stop(self):
+        """Stop the listener and close the Redis connection"""
+        if self._listener is not None:
+            self._listener.cancel()
+            self._listener = None
+        if self._redis is not None:
+            await self._redis.aclose()
+            self._redis = None
+
+
+shared_market_cache = SharedMarketCache()
@@ -0,0 +1,119 @@
+import asyncio
+import csv
+import io
+import time
+from bisect import bisect_left, bisect_right
+from typing import List, Dict, Optional
+from app.core.config import settings
+from app.services import http
+
+# Rebuild the index from the listing once a day
+INDEX_MAX_AGE_SECONDS = 24 * 3600
+
+
+class SymbolIndex:
+    """
+    In-memory search index over the listed symbol universe
+
+    Symbol prefixes are found by bisecting a sorted symbol list. Substring
+    matches scan one lowercase buffer of all "symbol<TAB>name" lines with
+    str.find, so a query is a single C-level pass over the corpus rather
+    than a Python loop over every entry.
+    """
+
+    def __init__(self, entries: List[Dict]):
+        self.entries = sorted(entries, key=lambda e: e["symbol"])
+        self._symbols = [e["symbol"] for e in self.entries]
+
+        lines = [f"{e['symbol']}\t{e['name']}".lower() for e in self.entries]
+        self._offsets = []
+        offset = 0
+        for line in lines:
+            self._offsets.append(offset)
+            offset += len(line) + 1
+        self._blob = "\n".join(lines)
+        self.built_at = time.monotonic()
+
+    def search(self, query: str, limit: int = 10) -> List[Dict]:
+        """
+        Find symbols matching a query
+
+        Exact symbol match first, then symbol prefix matches, then symbols
+        or names containing the query.
+        """
+        needle = " ".join(query.split()).lower()
+        if not needle or limit <= 0:
+            return []
+
+        found: List[int] = []
+        seen = set()
+
+        def add(idx: int) -> bool:
+            if idx not in seen:
+                seen.add(idx)
+                found.append(idx)
+            return len(found) >= limit
+
+        # Symbol prefix matches (exact match sorts first)
+        prefix = needle.upper()
+        start = bisect_left(self._symbols, prefix)
+        end = bisect_right(self._symbols, prefix + "\uffff")
+        for idx in range(start, end):
+            if add(idx):
+                return [self.entries[i] for i in found]
+
+        # Substring matches anywhere in symbol or name
+        pos = self._blob.find(needle)
+        while pos != -1:
+            idx = bisect_right(self._offsets, pos) - 1
+            if add(idx):
+                break
+            if idx + 1 >= len(self._offsets):
+                break
+            pos = self._blob.find(needle, self._offsets[idx + 1])
+
+        return [self.entries[i] for i in found]
+
+
+async def _load_listing() -> List[Dict]:
+    """
+    Fetch active listings from AlphaVantage
+
+    Endpoint: GET /query?function=LISTING_STATUS (CSV)
+    """
+    if not settings.ALPHA_VANTAGE_API_KEY:
+        raise RuntimeError("ALPHA_VANTAGE_API_KEY is not configured")
+
+    response = await http.client.get(
+        settings.ALPHA_VANTAGE_BASE_URL,
+        params={"function": "LISTING_STATUS", "apikey": settings.ALPHA_VANTAGE_API_KEY}
+    )
+    response.raise_for_status()
+
+    return [
+        {
+            "symbol": row["symbol"],
+            "name": row["name"],
+            "type": row["assetType"],
+            "exchange": row["exchange"],
+        }
+        for row in csv.DictReader(io.StringIO(response.text))
+        if row.get("symbol")
+    ]
+
+
+_index: Optional[SymbolIndex] = None
+_index_lock = asyncio.Lock()
+
+
+async def get_symbol_index() -> SymbolIndex:
+    """Get the module-level index, building or refreshing it when needed"""
+    global _index
+
+    if _index is not None and time.monotonic() - _index.built_at < INDEX_MAX_AGE_SECONDS:
+        return _index
+
+    async with _index_lock:
+        if _index is None or time.monotonic() - _index.built_at >= INDEX_MAX_AGE_SECONDS:
+            _index = SymbolIndex(await _load_listing())
+    return _index
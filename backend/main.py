@@ -1,24 +1,57 @@
-from fastapi import FastAPI
+import logging
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Depends, Request
 from fastapi.middleware.cors import CORSMiddleware
-from app.core.config import settings
+from prometheus_client import make_asgi_app
+from app.core.compression import CompressionMiddleware
+from app.core.config import Settings, get_settings
+from app.core.responses import ORJSONResponse
 from app.api.endpoints import portfolio, analytics, market_data, ml_insights
+from app.services import fastmath, http
+from app.services.market_data import ARROW_STREAM_MEDIA_TYPE
+from app.services.shared_market_cache import shared_market_cache
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Own process-wide resources: set up once at start, closed on shutdown"""
+    # Shared market cache invalidation listener; JIT kernels compiled up front
+    shared_market_cache.start()
+    fastmath.warmup()
+    app.state.http = http.client
+    app.state.market_cache = shared_market_cache
+    yield
+    await shared_market_cache.stop()
+    await http.close()
 
 # Create FastAPI app
 app = FastAPI(
     title=settings.PROJECT_NAME,
     description="Investment Hub API - Advanced portfolio analytics and ML insights",
-    version="1.0.0",
+    version=settings.VERSION,
     docs_url="/api/docs",
     redoc_url="/api/redoc",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan,
 )
 
-# Configure CORS
+# Configure CORS: explicit lists so browsers can cache preflights (max_age)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.ALLOWED_ORIGINS,
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
+    allow_headers=["Authorization", "Content-Type"],
+    max_age=86400,
+)
+
+# Compress large JSON payloads (zstd, else gzip); Arrow streams are sent as-is
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=1024,
+    excluded_media_types=(ARROW_STREAM_MEDIA_TYPE,),
 )
 
 # Include routers
@@ -27,12 +60,21 @@ app.include_router(analytics.router, prefix="/api/v1/analytics", tags=["analytic
 app.include_router(market_data.router, prefix="/api/v1/market", tags=["market"])
 app.include_router(ml_insights.router, prefix="/api/v1/ml", tags=["ml-insights"])
 
+@app.exception_handler(Exception)
+async def unhandled_exception_handler(request: Request, exc: Exception):
+    """Log unexpected errors once and return a 500 (HTTPExceptions are handled by FastAPI)"""
+    logger.exception("Unhandled error on %s %s", request.method, request.url.path)
+    return ORJSONResponse(status_code=500, content={"detail": str(exc)})
+
+# Prometheus metrics (cache hit/miss counters)
+app.mount("/metrics", make_asgi_app())
+
 @app.get("/")
-async def root():
+async def root(settings: Settings = Depends(get_settings)):
     """Root endpoint - API health check"""
     return {
         "message": "Investment Hub API",
-        "version": "1.0.0",
+        "version": settings.VERSION,
         "status": "running",
         "docs": "/api/docs"
     }
@@ -0,0 +1,112 @@
+import pytest
+import redis.asyncio as redis
+from app.services.shared_market_cache import shared_market_cache
+
+
+class FakePipeline:
+    """
+    The subset of redis.asyncio's Pipeline used by the services
+
+    Commands are buffered until execute(). After watch() and before
+    multi() commands run immediately, as in redis-py; execute() raises
+    WatchError if a watched key was written in the meantime.
+    """
+
+    def __init__(self, server: "FakeRedis", transaction: bool):
+        self.server = server
+        self.transaction = transaction
+        self.watched = {}
+        self.immediate = False
+        self.commands = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        self.watched = {}
+
+    async def watch(self, *keys):
+        self.watched = {key: self.server.versions.get(key, 0) for key in keys}
+        self.immediate = True
+
+    async def unwatch(self):
+        self.watched = {}
+        self.immediate = False
+
+    def multi(self):
+        self.immediate = False
+
+    async def mget(self, keys):
+        return await self.server.mget(keys)
+
+    def set(self, key, value, ex=None):
+        self.commands.append(("set", key, value, ex))
+        return self
+
+    def setex(self, key, ttl, value):
+        return self.set(key, value, ex=ttl)
+
+    def delete(self, *keys):
+        self.commands.append(("delete", keys))
+        return self
+
+    async def execute(self):
+        if any(self.server.versions.get(k, 0) != v for k, v in self.watched.items()):
+            self.commands = []
+            raise redis.WatchError("Watched variable changed.")
+
+        results = []
+        for command in self.commands:
+            if command[0] == "set":
+                _, key, value, ex = command
+                results.append(await self.server.set(key, value, ex=ex))
+            else:
+                results.append(await self.server.delete(*command[1]))
+        self.commands = []
+        self.watched = {}
+        return results
+
+
+class FakeRedis:
+    """In-memory stand-in for redis.asyncio.Redis (no expiry, TTLs are recorded)"""
+
+    def __init__(self):
+        self.data = {}
+        self.ttls = {}
+        self.versions = {}
+
+    def _touch(self, key):
+        self.versions[key] = self.versions.get(key, 0) + 1
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def mget(self, keys):
+        return [self.data.get(key) for key in keys]
+
+    async def set(self, key, value, ex=None):
+        self.data[key] = value
+        self.ttls[key] = ex
+        self._touch(key)
+        return True
+
+    async def delete(self, *keys):
+        removed = 0
+        for key in keys:
+            if key in self.data:
+                del self.data[key]
+                self.ttls.pop(key, None)
+                self._touch(key)
+                removed += 1
+        return removed
+
+    def pipeline(self, transaction: bool = True) -> FakePipeline:
+        return FakePipeline(self, transaction)
+
+
+@pytest.fixture
+def fake_redis(monkeypatch):
+    """Point the shared market cache (and everything built on it) at a FakeRedis"""
+    server = FakeRedis()
+    monkeypatch.setattr(shared_market_cache, "_redis", server)
+    return server
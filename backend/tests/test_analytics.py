@@ -0,0 +1,216 @@
+import numpy as np
+import pytest
+from types import SimpleNamespace
+from app.schemas.portfolio import PositionDetail
+from app.services import fastmath
+from app.services.analytics import PortfolioAnalytics, PositionsArray, TailTracker
+
+
+@pytest.fixture
+def returns():
+    """250 observations of 4 correlated assets"""
+    rng = np.random.default_rng(11)
+    mix = rng.normal(size=(4, 4))
+    return rng.normal(0.0005, 0.01, (250, 4)) @ mix
+
+
+def test_online_cov_matches_numpy(returns):
+    np.testing.assert_allclose(
+        PortfolioAnalytics.online_cov(returns), np.cov(returns, rowvar=False), rtol=1e-9
+    )
+
+
+def test_online_corr_matches_numpy(returns):
+    np.testing.assert_allclose(
+        PortfolioAnalytics.online_corr(returns), np.corrcoef(returns, rowvar=False), atol=1e-12
+    )
+
+
+def test_online_cov_is_zero_for_single_observation(returns):
+    np.testing.assert_array_equal(PortfolioAnalytics.online_cov(returns[:1]), np.zeros((4, 4)))
+
+
+def test_online_corr_zeroes_constant_column(returns):
+    returns = returns.copy()
+    returns[:, 2] = 0.01
+    corr = PortfolioAnalytics.online_corr(returns)
+    assert np.isfinite(corr).all()
+    assert not corr[2].any() and not corr[:, 2].any()
+
+
+def test_correlation_matrix_matches_numpy(returns):
+    symbols = ["A", "B", "C", "D"]
+    result = PortfolioAnalytics.correlation_matrix(returns, symbols)
+    expected = np.corrcoef(returns, rowvar=False)
+    for i, a in enumerate(symbols):
+        for j, b in enumerate(symbols):
+            assert result[a][b] == pytest.approx(expected[i, j], abs=1e-5)
+
+
+def test_calculate_correlation_matrix_from_prices(returns):
+    symbols = ["A", "B", "C", "D"]
+    prices = 100 * np.cumprod(1 + returns, axis=0)
+    positions = [SimpleNamespace(symbol=s) for s in symbols]
+    historical = {s: prices[:, i].tolist() for i, s in enumerate(symbols)}
+
+    result = PortfolioAnalytics.calculate_correlation_matrix(positions, historical)
+
+    expected = np.corrcoef(np.diff(prices, axis=0) / prices[:-1], rowvar=False)
+    for i, a in enumerate(symbols):
+        for j, b in enumerate(symbols):
+            assert result[a][b] == pytest.approx(expected[i, j], abs=1e-5)
+
+
+def test_risk_metrics_skip_correlation_without_history():
+    metrics = PortfolioAnalytics.calculate_risk_metrics(
+        [100.0, 101.0, 99.0], asset_returns={"A": [0.01], "B": [0.02]}
+    )
+    assert metrics.correlation_matrix is None
+
+
+def test_closed_form_mvp_matches_kkt_solve(returns):
+    mu = returns.mean(axis=0)
+    cov = np.cov(returns, rowvar=False)
+    lam = 0.5
+    n = len(mu)
+
+    # Stationarity Σw − λμ + ν1 = 0 with 1'w = 1
+    kkt = np.block([[cov, np.ones((n, 1))], [np.ones((1, n)), np.zeros((1, 1))]])
+    expected = np.linalg.solve(kkt, np.append(lam * mu, 1.0))[:n]
+
+    weights = PortfolioAnalytics.closed_form_mvp(mu, cov, lam)
+    np.testing.assert_allclose(weights, expected, rtol=1e-8, atol=1e-12)
+    assert weights.sum() == pytest.approx(1.0)
+
+
+def test_closed_form_mvp_rejects_singular_covariance():
+    cov = np.ones((3, 3))
+    assert PortfolioAnalytics.closed_form_mvp(np.zeros(3), cov, 0.5) is None
+
+
+def test_tail_tracker_matches_var_cvar(returns):
+    r = returns[:, 0]
+    tracker = TailTracker.from_returns(r[:50].tolist())
+    for i in range(50, len(r)):
+        tracker.push(r[i])
+        var, cvar = fastmath.var_cvar(r[:i + 1], 0.05)
+        assert len(tracker) == i + 1
+        assert tracker.var() == pytest.approx(var)
+        assert tracker.cvar() == pytest.approx(cvar)
+
+
+def test_tail_tracker_narrow_tail_matches_tail_risk(returns):
+    r = returns[:, 1]
+    tracker = TailTracker.from_returns(r.tolist())
+    assert tracker.tail_risk(0.01) == pytest.approx(fastmath.tail_risk(r, 0.05, 0.01))
+
+
+def test_risk_metrics_from_tail_tracker_match_full_partition(returns):
+    values = 100 * np.cumprod(1 + returns[:, 0])
+    r = np.diff(values) / values[:-1]
+    tracker = TailTracker.from_returns(r[:100].tolist())
+    for x in r[100:]:
+        tracker.push(x)
+
+    incremental = PortfolioAnalytics.calculate_risk_metrics(values.tolist(), tail=tracker)
+    full = PortfolioAnalytics.calculate_risk_metrics(values.tolist())
+    assert incremental.var_95 == pytest.approx(full.var_95, rel=1e-5)
+    assert incremental.var_99 == pytest.approx(full.var_99, rel=1e-5)
+    assert incremental.cvar_95 == pytest.approx(full.cvar_95, rel=1e-5)
+
+
+def test_risk_metrics_reject_mismatched_tail_tracker(returns):
+    values = (100 * np.cumprod(1 + returns[:, 0])).tolist()
+    with pytest.raises(ValueError):
+        PortfolioAnalytics.calculate_risk_metrics(values, tail=TailTracker.from_returns([0.01]))
+
+
+def _position(symbol, quantity, price, beta=None, volatility=None):
+    return PositionDetail(
+        symbol=symbol, name=symbol, quantity=quantity, cost_basis=100.0,
+        current_price=price, market_value=quantity * price,
+        gain_loss=quantity * (price - 100.0), gain_loss_percent=price - 100.0,
+        sector="Technology", asset_type="stock", day_change=0.0,
+        day_change_percent=0.0, portfolio_weight=0.0, beta=beta, volatility=volatility
+    )
+
+
+def test_compute_metrics_matches_per_position_sums():
+    positions = [_position("A", 10, 120.0, beta=1.2), _position("B", 30, 90.0, volatility=25.0)]
+    metrics = PortfolioAnalytics.compute_metrics(PositionsArray.from_positions(positions))
+
+    assert metrics["total_value"] == pytest.approx(1200.0 + 2700.0)
+    assert metrics["total_cost"] == pytest.approx(4000.0)
+    assert metrics["total_gain_loss"] == pytest.approx(200.0 - 300.0)
+    assert metrics["total_gain_loss_percent"] == pytest.approx(-2.5)
+    # Weighted over the positions where the value is known
+    assert metrics["beta"] == pytest.approx(1.2)
+    assert metrics["volatility"] == pytest.approx(25.0)
+
+
+def test_calculate_portfolio_metrics_from_positions_and_history():
+    positions = [_position("A", 10, 120.0, beta=1.2), _position("B", 30, 90.0, beta=0.8)]
+    values = list(np.linspace(3500.0, 3900.0, 30))
+
+    metrics = PortfolioAnalytics.calculate_portfolio_metrics(positions, values, ytd_start=5)
+
+    assert metrics.total_return == pytest.approx(-100.0)
+    assert metrics.beta == pytest.approx((1200 * 1.2 + 2700 * 0.8) / 3900)
+    assert metrics.daily_return == pytest.approx(values[-1] - values[-2])
+    assert metrics.monthly_return == pytest.approx(values[-1] - values[-22])
+    assert metrics.ytd_return_percent == pytest.approx((values[-1] / values[5] - 1) * 100)
+    assert metrics.max_drawdown == 0.0
+
+
+def test_calculate_portfolio_metrics_without_history():
+    positions = [_position("A", 10, 120.0, volatility=30.0)]
+    metrics = PortfolioAnalytics.calculate_portfolio_metrics(positions, [])
+    assert metrics.daily_return == 0.0
+    assert metrics.volatility == pytest.approx(30.0)
+
+
+def _optimizable(returns):
+    symbols = ["A", "B", "C", "D"]
+    prices = 100 * np.cumprod(1 + returns, axis=0)
+    positions = [_position(s, 10, 100.0 + i) for i, s in enumerate(symbols)]
+    return positions, {s: prices[:, i].tolist() for i, s in enumerate(symbols)}
+
+
+@pytest.mark.parametrize("objective,key", [("tracking_error", "benchmark_weights"), ("risk_parity", "risk_budget")])
+def test_optimize_rejects_targets_without_weight(returns, objective, key):
+    positions, history = _optimizable(returns)
+    for targets in ({"XYZ": 1.0}, {"A": 0.0, "B": 0.0}):
+        with pytest.raises(ValueError):
+            PortfolioAnalytics.optimize_portfolio(
+                positions, historical_prices=history, constraints={key: targets}, objective=objective
+            )
+
+
+def test_optimize_rejects_negative_risk_budget(returns):
+    positions, history = _optimizable(returns)
+    with pytest.raises(ValueError):
+        PortfolioAnalytics.optimize_portfolio(
+            positions, historical_prices=history,
+            constraints={"risk_budget": {"A": 1.0, "B": 0.5, "C": -0.2, "D": 0.3}},
+            objective="risk_parity"
+        )
+
+
+def test_optimize_normalizes_partial_targets(returns):
+    positions, history = _optimizable(returns)
+    result = PortfolioAnalytics.optimize_portfolio(
+        positions, historical_prices=history,
+        constraints={"risk_budget": {"A": 2.0, "B": 2.0, "C": 2.0, "D": 2.0, "XYZ": 5.0}},
+        objective="risk_parity"
+    )
+    assert sum(result.recommended_weights.values()) == pytest.approx(1.0, abs=1e-6)
+
+
+def test_optimize_reports_positions_without_history_at_zero(returns):
+    positions, history = _optimizable(returns)
+    del history["D"]
+    result = PortfolioAnalytics.optimize_portfolio(positions, historical_prices=history)
+
+    assert result.recommended_weights.keys() == result.current_allocation.keys()
+    assert result.recommended_weights["D"] == 0.0
+    assert sum(result.recommended_weights.values()) == pytest.approx(1.0, abs=1e-6)
@@ -0,0 +1,98 @@
+import asyncio
+import msgpack
+import pytest
+from app.schemas.portfolio import Position
+from app.services import portfolio_cache
+from app.services.cache import cached
+from app.services.portfolio_cache import portfolio_aggregate_cache
+from app.services.shared_market_cache import shared_market_cache, quote_key
+
+
+def _position(symbol: str, quantity: float, price: float, sector: str = "Technology") -> Position:
+    cost_basis = 100.0
+    return Position(
+        symbol=symbol,
+        name=symbol,
+        quantity=quantity,
+        cost_basis=cost_basis,
+        current_price=price,
+        market_value=quantity * price,
+        gain_loss=quantity * (price - cost_basis),
+        gain_loss_percent=(price / cost_basis - 1) * 100,
+        sector=sector,
+        asset_type="stock"
+    )
+
+
+def test_shared_cache_round_trip(fake_redis):
+    key = quote_key("test", "AAPL")
+    value = {"price": 189.5, "volume": 1200, "symbol": "AAPL"}
+
+    asyncio.run(shared_market_cache.set(key, value, "quote"))
+
+    assert asyncio.run(shared_market_cache.get(key, "quote")) == value
+    assert fake_redis.ttls[key] == 10
+    assert msgpack.unpackb(fake_redis.data[key]) == value
+
+
+def test_shared_cache_get_many_reports_misses(fake_redis):
+    asyncio.run(shared_market_cache.set_many({"a": 1, "b": [1, 2]}, "history"))
+    assert asyncio.run(shared_market_cache.get_many(["a", "missing", "b"], "history")) == [1, None, [1, 2]]
+    assert fake_redis.ttls["a"] == 60
+
+
+def test_shared_cache_explicit_ttl(fake_redis):
+    asyncio.run(shared_market_cache.set("key", 1, "history", ttl=5))
+    assert fake_redis.ttls["key"] == 5
+
+
+def test_cached_decorator_calls_through_once(fake_redis):
+    calls = []
+
+    @cached("fundamentals", key=lambda symbol: f"test:{symbol}")
+    async def fetch(symbol):
+        calls.append(symbol)
+        return {"symbol": symbol}
+
+    assert asyncio.run(fetch("MSFT")) == {"symbol": "MSFT"}
+    assert asyncio.run(fetch("MSFT")) == {"symbol": "MSFT"}
+    assert calls == ["MSFT"]
+
+
+def test_portfolio_merge_matches_regeneration(fake_redis):
+    positions = [
+        _position("AAPL", 10, 150.0),
+        _position("JPM", 5, 120.0, "Financial Services"),
+        _position("AAPL", 4, 150.0),
+    ]
+    asyncio.run(portfolio_aggregate_cache.refresh("p1", positions))
+
+    changed = [
+        _position("AAPL", 10, 160.0),
+        _position("XOM", 8, 90.0, "Energy"),
+        _position("AAPL", 4, 160.0),
+    ]
+    merged = asyncio.run(portfolio_aggregate_cache.refresh("p1", changed))
+    expected = portfolio_cache._regenerate(portfolio_cache._contributions(changed))
+
+    assert merged["totals"] == pytest.approx(expected["totals"])
+    assert merged["sector"] == pytest.approx(expected["sector"])
+    assert "Financial Services" not in merged["sector"]
+    assert merged["asset"] == pytest.approx({"stock": 14 * 160.0 + 8 * 90.0})
+    cached_lots = msgpack.unpackb(fake_redis.data[portfolio_cache._positions_key("p1")])
+    assert cached_lots == portfolio_cache._contributions(changed)
+
+
+def test_portfolio_lots_of_one_symbol_are_kept_apart(fake_redis):
+    positions = [_position("AAPL", 10, 150.0), _position("AAPL", 4, 150.0)]
+    aggregates = asyncio.run(portfolio_aggregate_cache.refresh("p1", positions))
+
+    assert aggregates["totals"]["count"] == 2
+    assert aggregates["totals"]["market_value"] == pytest.approx(14 * 150.0)
+
+
+def test_portfolio_aggregates_expire(fake_redis):
+    asyncio.run(portfolio_aggregate_cache.refresh("p1", [_position("AAPL", 1, 150.0)]))
+
+    assert fake_redis.ttls
+    assert all(ttl == portfolio_cache.AGGREGATE_TTL_SECONDS for ttl in fake_redis.ttls.values())
@@ -0,0 +1,87 @@
+import numpy as np
+import pytest
+from app.services import fastmath
+
+
+@pytest.fixture
+def returns():
+    return np.random.default_rng(7).normal(0.0005, 0.02, 500)
+
+
+@pytest.fixture
+def equity(returns):
+    return 100 * np.cumprod(1 + returns)
+
+
+def test_max_drawdown_matches_numpy(equity):
+    expected = -(equity / np.maximum.accumulate(equity) - 1).min()
+    assert fastmath.max_drawdown(equity) == pytest.approx(expected)
+
+
+def test_max_drawdown_parallel_matches_serial(equity):
+    assert fastmath._max_drawdown_parallel(equity, 8) == pytest.approx(
+        fastmath._max_drawdown_serial(equity)
+    )
+
+
+def test_drawdown_periods_recover_at_new_peak():
+    equity = np.array([1.0, 0.8, 0.9, 1.1, 1.0, 0.7])
+    starts, troughs, recoveries = fastmath.drawdown_periods(equity)
+    assert starts.tolist() == [0, 3]
+    assert troughs.tolist() == [1, 5]
+    assert recoveries.tolist() == [3, -1]
+
+
+def test_var_cvar_matches_sorted_tail(returns):
+    k = int(np.floor(0.05 * len(returns)))
+    tail = np.sort(returns)[:k + 1]
+    var, cvar = fastmath.var_cvar(returns, 0.05)
+    assert var == pytest.approx(tail[-1])
+    assert cvar == pytest.approx(tail.mean())
+
+
+def test_tail_risk_matches_var_cvar(returns):
+    var_w, cvar_w, var_n, cvar_n = fastmath.tail_risk(returns, 0.05, 0.01)
+    assert (var_w, cvar_w) == pytest.approx(fastmath.var_cvar(returns, 0.05))
+    assert (var_n, cvar_n) == pytest.approx(fastmath.var_cvar(returns, 0.01))
+
+
+def test_tail_index_absorbs_rounding():
+    assert fastmath.tail_index(1 - 0.9, 10) == 1
+
+
+def test_zscore_last_matches_numpy(equity):
+    r = np.diff(equity) / equity[:-1]
+    z, last = fastmath.zscore_last(equity)
+    assert last == pytest.approx(r[-1])
+    assert z == pytest.approx((r[-1] - r[:-1].mean()) / r[:-1].std())
+
+
+def test_zscore_last_is_zero_without_variance():
+    z, last = fastmath.zscore_last(np.array([1.0, 1.0, 1.0, 1.1]))
+    assert z == 0.0
+    assert last == pytest.approx(0.1)
+
+
+def test_ewma_var_matches_explicit_weights(returns):
+    lam = 0.94
+    weights = lam ** np.arange(len(returns))[::-1]
+    expected = (weights * returns ** 2).sum() / weights.sum()
+    assert fastmath.ewma_var(returns, lam) == pytest.approx(expected)
+
+
+def test_mean_std_matches_numpy(returns):
+    mean, std = fastmath.mean_std(returns)
+    assert mean == pytest.approx(returns.mean())
+    assert std == pytest.approx(returns.std())
+
+
+def test_beta_matches_numpy(returns):
+    market = np.random.default_rng(8).normal(0.0, 0.01, len(returns))
+    asset = 1.3 * market + returns
+    expected = np.cov(asset, market)[0, 1] / np.var(market, ddof=1)
+    assert fastmath.beta(asset, market) == pytest.approx(expected)
+
+
+def test_beta_defaults_to_one_for_flat_market(returns):
+    assert fastmath.beta(returns, np.zeros_like(returns)) == 1.0
@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+from app.schemas.portfolio import Position
+from app.services.ml_service import MLService, RollingMoments
+
+
+def test_rolling_moments_match_numpy_window():
+    returns = np.random.default_rng(3).normal(0.001, 0.02, 200)
+    moments = RollingMoments(window=30)
+
+    for i, r in enumerate(returns):
+        moments.push(float(r))
+        window = returns[max(0, i - 29):i + 1]
+        assert len(moments) == len(window)
+        assert moments.mean == pytest.approx(window.mean(), abs=1e-12)
+        assert moments.std() == pytest.approx(window.std(), rel=1e-6)
+
+
+def test_rolling_moments_from_returns_keeps_last_window():
+    returns = list(np.random.default_rng(4).normal(0.0, 0.01, 100))
+    moments = RollingMoments.from_returns(returns, window=20)
+    assert moments.mean == pytest.approx(np.mean(returns[-20:]))
+    assert moments.std() == pytest.approx(np.std(returns[-20:]))
+
+
+def test_rolling_moments_empty():
+    assert RollingMoments().std() == 0.0
+
+
+def _position(symbol, market_value, gain_loss_percent, sector):
+    return Position(
+        symbol=symbol, name=symbol, quantity=1.0, cost_basis=market_value,
+        current_price=market_value, market_value=market_value,
+        gain_loss=market_value * gain_loss_percent / 100, gain_loss_percent=gain_loss_percent,
+        sector=sector, asset_type="stock"
+    )
+
+
+def test_portfolio_recommendation_screens():
+    positions = [
+        _position("BIG", 500.0, 5.0, "Technology"),
+        _position("DOWN", 100.0, -20.0, "Energy"),
+        _position("RUN", 200.0, 80.0, "Healthcare"),
+        _position("OK", 200.0, 10.0, "Financial Services"),
+    ]
+    recommendations = MLService().generate_portfolio_recommendation(positions)
+    flagged = {(r.action, r.symbol) for r in recommendations}
+
+    assert ("rebalance", "BIG") in flagged
+    assert ("review", "DOWN") in flagged
+    assert ("consider_sell", "RUN") in flagged
+    assert not any(symbol == "OK" for _, symbol in flagged)
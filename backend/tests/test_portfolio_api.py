@@ -0,0 +1,21 @@
+import asyncio
+import pytest
+from fastapi import HTTPException
+from app.api.endpoints import portfolio
+from app.core.config import Settings
+
+
+@pytest.mark.parametrize("endpoint", [portfolio.get_sector_allocation, portfolio.get_asset_allocation])
+def test_allocations_unavailable_outside_debug(endpoint, fake_redis):
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(endpoint(settings=Settings(DEBUG=False)))
+    assert exc.value.status_code == 501
+    assert not fake_redis.data
+
+
+def test_allocations_served_from_cache_in_debug(fake_redis):
+    sector = asyncio.run(portfolio.get_sector_allocation(settings=Settings(DEBUG=True)))
+    asset = asyncio.run(portfolio.get_asset_allocation(settings=Settings(DEBUG=True)))
+
+    assert sum(sector.values()) == pytest.approx(sum(asset.values()))
+    assert fake_redis.data
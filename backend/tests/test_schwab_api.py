@@ -0,0 +1,13 @@
+from datetime import date, timedelta
+from app.services import schwab_api
+
+
+def test_mock_payload_is_memoized_per_day_and_bounded():
+    schwab_api._build_mock_payload.cache_clear()
+    first = date(2026, 1, 1)
+
+    assert schwab_api._build_mock_payload("a", first) is schwab_api._build_mock_payload("a", first)
+    for offset in range(schwab_api._MOCK_PAYLOAD_CACHE_SIZE + 5):
+        schwab_api._build_mock_payload("a", first + timedelta(days=offset))
+
+    assert schwab_api._build_mock_payload.cache_info().currsize == schwab_api._MOCK_PAYLOAD_CACHE_SIZE